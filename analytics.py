@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Normalization and aggregate reports for scraped SmartJob.az candidates
+
+normalize() turns a batch of candidate records into typed NumPy columns:
+numeric salary range and currency, integer age, last_updated as datetime64,
+and experience in months, both from the sidebar text ("1-3 il") and summed
+over the listed jobs ("01.2018 - 10.2019"). Fields repeat a small set of
+distinct strings, so each distinct string is parsed once and the result is
+broadcast back through np.unique's inverse index. The reports (salary
+percentiles per category, language level distribution, freshness histogram)
+work on the columns with vectorized group operations instead of loops over
+dicts. Needs numpy.
+
+Usage:
+    python analytics.py FILE [FILE ...] [--currency AZN] [--as-of 2025-06-30]
+                        [--json report.json] [--npz columns.npz]
+"""
+
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from candidate_index import LEVELS, level_rank, normalize as normalize_term
+from consolidate import iter_records
+
+CURRENCIES = {
+    'azn': 'AZN', 'manat': 'AZN', '₼': 'AZN',
+    'usd': 'USD', '$': 'USD',
+    'eur': 'EUR', '€': 'EUR',
+    'rub': 'RUB', '₽': 'RUB',
+}
+NUMBER = re.compile(r'\d+(?:[ \u00a0]\d{3})*')
+EXPERIENCE = re.compile(r'(\d+)(?:\s*-\s*\d+)?\s*(il|ay)')
+MONTH_YEAR = re.compile(r'(?:(\d{1,2})\.)?(\d{4})')
+
+# Level labels of the language distribution, by rank on the CEFR scale
+LEVEL_LABELS = ['other'] + [label.upper() if len(label) == 2 else label.capitalize()
+                            for label, _ in sorted(LEVELS.items(), key=lambda item: item[1])]
+FRESHNESS_DAYS = [7, 30, 90, 180, 365]
+MISSING = -1
+# Longest plausible work experience; larger values are typos such as '2019 il' or '20112022 il'
+MAX_EXPERIENCE_MONTHS = 70 * 12
+
+
+@dataclass
+class CandidateColumns:
+    """Typed columns of a batch of candidates; MISSING (-1), NaN and NaT mark absent values"""
+    resume_id: np.ndarray
+    category: np.ndarray
+    salary_min: np.ndarray
+    salary_max: np.ndarray
+    currency: np.ndarray
+    negotiable: np.ndarray
+    age: np.ndarray
+    last_updated: np.ndarray
+    work_experience_months: np.ndarray
+    experience_months: np.ndarray
+    # One row per listed language, pointing at its candidate
+    language_owner: np.ndarray
+    language: np.ndarray
+    language_level: np.ndarray
+
+    def __len__(self):
+        return len(self.resume_id)
+
+    def save(self, path) -> Path:
+        """Save the columns as an uncompressed .npz archive"""
+        path = Path(path)
+        np.savez(path, **{field.name: getattr(self, field.name) for field in fields(self)})
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'CandidateColumns':
+        with np.load(path) as archive:
+            return cls(**{field.name: archive[field.name] for field in fields(cls)})
+
+
+def parse_salary(text: str) -> Tuple[float, float, str, bool]:
+    """(min, max, currency, negotiable) of a salary such as '1 200 AZN' or '800-1 000 AZN'
+
+    A salary of 0 counts as not stated.
+    """
+    lowered = text.casefold()
+    numbers = [float(re.sub(r'\D', '', number)) for number in NUMBER.findall(text)]
+    numbers = [number for number in numbers if number > 0]
+    currency = next((code for token, code in CURRENCIES.items() if token in lowered), '')
+    if not numbers:
+        return np.nan, np.nan, currency, 'razılaşma' in lowered
+    return numbers[0], numbers[1] if len(numbers) > 1 else numbers[0], currency, False
+
+
+def parse_age(text: str) -> int:
+    match = NUMBER.search(text)
+    age = int(match.group()) if match else MISSING
+    return age if 14 <= age <= 100 else MISSING
+
+
+def parse_date(text: str) -> np.datetime64:
+    """dd.mm.yyyy as datetime64[D], NaT when it does not parse"""
+    try:
+        return np.datetime64(datetime.strptime(text.strip()[:10], '%d.%m.%Y').date(), 'D')
+    except ValueError:
+        return np.datetime64('NaT', 'D')
+
+
+def parse_experience(text: str) -> int:
+    """Lower bound in months of a work experience such as '1-3 il', '5 ildən çox' or '1 ildən az'"""
+    text = normalize_term(text)
+    if not text:
+        return MISSING
+    if re.search(r'\baz\b', text) or 'təcrübəsiz' in text or 'yoxdur' in text:
+        return 0
+    matches = EXPERIENCE.findall(text)
+    if not matches:
+        return MISSING
+    months = sum(int(number) * (12 if unit == 'il' else 1) for number, unit in matches)
+    return months if months <= MAX_EXPERIENCE_MONTHS else MISSING
+
+
+def parse_duration(text: str) -> Tuple[int, int]:
+    """Start and end month (year * 12 + month - 1) of '01.2018 - 10.2019'; end is MISSING while ongoing
+
+    An end that is not a date ('hələdə işləyirəm', or nothing after the dash) means the job is ongoing.
+    """
+    def month(part: str, default_month: int) -> Optional[int]:
+        match = MONTH_YEAR.search(part)
+        if not match:
+            return None
+        number = int(match.group(1)) if match.group(1) else default_month
+        return int(match.group(2)) * 12 + min(max(number, 1), 12) - 1
+
+    first, dash, second = text.partition('-')
+    start = month(first, 1)
+    if start is None:
+        return MISSING, MISSING
+    end = month(second, 12) if dash else month(first, 12)
+    return start, MISSING if end is None else end
+
+
+def map_unique(values: List[str], parse: Callable, dtypes) -> Tuple[np.ndarray, ...]:
+    """Parse each distinct string once and broadcast the results to every row"""
+    unique, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+    parsed = [parse(value) for value in unique.tolist()]
+    if not isinstance(dtypes, tuple):
+        return np.array(parsed, dtype=dtypes).reshape(len(unique))[inverse]
+    columns = list(zip(*parsed)) if parsed else [()] * len(dtypes)
+    return tuple(np.array(column, dtype=dtype).reshape(len(unique))[inverse] for column, dtype in zip(columns, dtypes))
+
+
+def month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def normalize(candidates: Iterable[Dict], as_of: Optional[date] = None) -> CandidateColumns:
+    """Typed columns of a batch of candidate records; ongoing jobs end at the as_of month"""
+    current_month = month_index(as_of or date.today())
+
+    raw = {field: [] for field in ('resume_id', 'category', 'salary', 'age', 'last_updated', 'work_experience')}
+    detailed = []
+    language_owner, language_names, level_texts = [], [], []
+    job_owner, durations = [], []
+
+    for row, candidate in enumerate(candidates):
+        raw['resume_id'].append(candidate.get('resume_id') or candidate.get('profile_url') or '')
+        raw['category'].append(candidate.get('category_name') or '')
+        raw['salary'].append(candidate.get('salary') or '')
+        raw['age'].append(candidate.get('age') or '')
+        raw['last_updated'].append(candidate.get('last_updated') or '')
+        raw['work_experience'].append(candidate.get('work_experience') or '')
+        detailed.append('experience' in candidate)
+
+        for language in candidate.get('languages') or []:
+            language_owner.append(row)
+            language_names.append(language.get('language') or '')
+            level_texts.append(language.get('level') or '')
+        for job in candidate.get('experience') or []:
+            job_owner.append(row)
+            durations.append(job.get('duration') or '')
+
+    count = len(detailed)
+    salary_min, salary_max, currency, negotiable = map_unique(raw['salary'], parse_salary,
+                                                              (np.float64, np.float64, str, bool))
+
+    # Months of each listed job, summed per candidate; undetailed records have no value
+    starts, ends = map_unique(durations, parse_duration, (np.int32, np.int32))
+    ends = np.where(ends == MISSING, current_month, ends)
+    months = np.where(starts == MISSING, 0, np.maximum(ends - starts + 1, 0))
+    experience_months = np.bincount(np.array(job_owner, dtype=np.intp), weights=months, minlength=count).astype(np.int32)
+    experience_months[~np.array(detailed, dtype=bool)] = MISSING
+
+    return CandidateColumns(
+        resume_id=np.array(raw['resume_id'], dtype=str),
+        category=np.array(raw['category'], dtype=str),
+        salary_min=salary_min,
+        salary_max=salary_max,
+        currency=currency,
+        negotiable=negotiable,
+        age=map_unique(raw['age'], parse_age, np.int16),
+        last_updated=map_unique(raw['last_updated'], parse_date, 'datetime64[D]'),
+        work_experience_months=map_unique(raw['work_experience'], parse_experience, np.int32),
+        experience_months=experience_months,
+        language_owner=np.array(language_owner, dtype=np.int32),
+        language=np.array(language_names, dtype=str),
+        language_level=map_unique(level_texts, level_rank, np.int8),
+    )
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray, percentiles: Iterable[float]) -> Tuple[np.ndarray, np.ndarray, Dict[float, np.ndarray]]:
+    """Percentiles of values within each group, interpolated like np.percentile"""
+    labels, inverse = np.unique(groups, return_inverse=True)
+    ordered = values[np.lexsort((values, inverse))]
+    counts = np.bincount(inverse, minlength=len(labels))
+    starts = np.cumsum(counts) - counts
+    last = starts + counts - 1
+
+    result = {}
+    for q in percentiles:
+        position = starts + (counts - 1) * (q / 100)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, last)
+        result[q] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+    return labels, counts, result
+
+
+def salary_percentiles(columns: CandidateColumns, percentiles=(10, 25, 50, 75, 90), currency: str = 'AZN') -> List[Dict]:
+    """Salary percentiles per category_name, largest categories first; uses the lower end of salary ranges"""
+    mask = ~np.isnan(columns.salary_min) & (columns.currency == currency)
+    if not mask.any():
+        return []
+
+    values = columns.salary_min[mask]
+    labels, counts, result = group_percentiles(columns.category[mask], values, percentiles)
+    sums = np.bincount(np.unique(columns.category[mask], return_inverse=True)[1], weights=values)
+
+    rows = []
+    for index in np.argsort(-counts, kind='stable'):
+        row = {'category': str(labels[index]), 'count': int(counts[index]), 'mean': round(float(sums[index] / counts[index]), 1)}
+        row.update({f"p{q:g}": round(float(result[q][index]), 1) for q in percentiles})
+        rows.append(row)
+    return rows
+
+
+def language_levels(columns: CandidateColumns) -> Dict[str, Dict[str, int]]:
+    """Number of candidates per language and level, most spoken languages first"""
+    if not len(columns.language):
+        return {}
+
+    languages, inverse = np.unique(columns.language, return_inverse=True)
+    levels = len(LEVEL_LABELS)
+    table = np.bincount(inverse * levels + columns.language_level, minlength=len(languages) * levels).reshape(-1, levels)
+
+    distribution = {}
+    for index in np.argsort(-table.sum(axis=1), kind='stable'):
+        distribution[str(languages[index])] = {LEVEL_LABELS[level]: int(table[index, level])
+                                               for level in range(levels) if table[index, level]}
+    return distribution
+
+
+def freshness_histogram(columns: CandidateColumns, as_of: Optional[date] = None, days: List[int] = FRESHNESS_DAYS) -> Dict[str, int]:
+    """Candidates per age bucket of last_updated, in days before as_of"""
+    known = ~np.isnat(columns.last_updated)
+    age_days = (np.datetime64(as_of or date.today(), 'D') - columns.last_updated[known]).astype(np.int64)
+    buckets = np.bincount(np.searchsorted(days, age_days, side='left'), minlength=len(days) + 1)
+
+    labels = [f"<= {days[0]}d"] + [f"{low + 1}-{high}d" for low, high in zip(days, days[1:])] + [f"> {days[-1]}d"]
+    histogram = {label: int(count) for label, count in zip(labels, buckets)}
+    histogram['unknown'] = int((~known).sum())
+    return histogram
+
+
+def summary(columns: CandidateColumns) -> Dict:
+    """Coverage and medians of the normalized fields"""
+    def median(values, missing):
+        present = values[~np.isnan(values)] if missing is None else values[values != missing]
+        return float(np.median(present)) if len(present) else None
+
+    currencies, counts = np.unique(columns.currency[columns.currency != ''], return_counts=True)
+    known_dates = columns.last_updated[~np.isnat(columns.last_updated)]
+    return {
+        'candidates': len(columns),
+        'with_salary': int((~np.isnan(columns.salary_min)).sum()),
+        'negotiable_salary': int(columns.negotiable.sum()),
+        'currencies': {str(code): int(count) for code, count in zip(currencies, counts)},
+        'median_age': median(columns.age, MISSING),
+        'median_work_experience_months': median(columns.work_experience_months, MISSING),
+        'median_experience_months': median(columns.experience_months, MISSING),
+        'oldest_update': str(known_dates.min()) if len(known_dates) else None,
+        'newest_update': str(known_dates.max()) if len(known_dates) else None,
+    }
+
+
+def build_report(columns: CandidateColumns, currency: str = 'AZN', as_of: Optional[date] = None) -> Dict:
+    return {
+        'summary': summary(columns),
+        'salary_percentiles': salary_percentiles(columns, currency=currency),
+        'language_levels': language_levels(columns),
+        'freshness': freshness_histogram(columns, as_of),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize scraped SmartJob.az candidates and print aggregate reports')
+    parser.add_argument('files', nargs='+', help='JSON, NDJSON or CSV scraper output')
+    parser.add_argument('--currency', default='AZN', help='Currency of the salary percentiles (default: AZN)')
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None,
+                        help='Reference date for freshness and ongoing jobs, YYYY-MM-DD (default: today)')
+    parser.add_argument('--json', default=None, help='Also save the report as JSON')
+    parser.add_argument('--npz', default=None, help='Also save the normalized columns as a NumPy .npz archive')
+
+    args = parser.parse_args()
+
+    records = [record for path in args.files for record in iter_records(Path(path))]
+
+    started = time.perf_counter()
+    columns = normalize(records, as_of=args.as_of)
+    normalized = time.perf_counter()
+    report = build_report(columns, currency=args.currency, as_of=args.as_of)
+    reported = time.perf_counter()
+
+    info = report['summary']
+    print(f"📊 {info['candidates']} candidates, {info['with_salary']} with a salary, "
+          f"{info['negotiable_salary']} negotiable, updated {info['oldest_update']} to {info['newest_update']}")
+    print(f"Median age {info['median_age']}, median experience {info['median_experience_months']} months")
+
+    print(f"\nSalary ({args.currency}) per category:")
+    print(f"{'category':<40} {'count':>6} {'p10':>8} {'p25':>8} {'p50':>8} {'p75':>8} {'p90':>8}")
+    for row in report['salary_percentiles']:
+        print(f"{row['category'][:40]:<40} {row['count']:>6} {row['p10']:>8.0f} {row['p25']:>8.0f} "
+              f"{row['p50']:>8.0f} {row['p75']:>8.0f} {row['p90']:>8.0f}")
+
+    print("\nLanguage levels:")
+    for language, levels in report['language_levels'].items():
+        print(f"{language:<20} " + '  '.join(f"{level}: {count}" for level, count in levels.items()))
+
+    print("\nLast updated:")
+    for bucket, count in report['freshness'].items():
+        print(f"{bucket:>12} {count:>6}")
+
+    print(f"\nNormalized in {(normalized - started) * 1000:.1f} ms, reports in {(reported - normalized) * 1000:.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ Report saved to {args.json}")
+    if args.npz:
+        print(f"✅ Columns saved to {columns.save(args.npz)}")
+
+
+if __name__ == "__main__":
+    main()
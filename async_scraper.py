@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Asynchronous fetch engine for SmartJob.az
+
+Keeps several requests in flight over pooled keep-alive connections instead of
+sleeping after every request. Pacing comes from a shared token bucket, so the
+request rate stays bounded no matter how many requests are outstanding.
+With --adaptive the bucket rate follows the AIMD throttle, and a Retry-After
+from the server holds back every request, not only the one being retried.
+Parsing and saving reuse SmartJobScraper, so the output is identical to the
+sequential engine.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from records import Candidate
+from smartjob_scraper import SmartJobScraper
+
+
+class TokenBucket:
+    """Shared requests-per-second budget for all in-flight requests"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def hold(self, seconds: float):
+        """Send nothing for the given time"""
+        self.tokens = 0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.updated:
+                    await asyncio.sleep(self.updated - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncSmartJobScraper(SmartJobScraper):
+    def __init__(self, concurrency=10, rate=None, **kwargs):
+        super().__init__(rate=rate, **kwargs)
+        self.concurrency = concurrency
+        self.bucket = None
+
+    async def fetch_async(self, session: aiohttp.ClientSession, url: str, retries: int = 3) -> Optional[bytes]:
+        """Fetch a raw page body with retries and error handling"""
+        cached = self.cached_response(url)
+        if self.replay:
+            if cached is None:
+                self.fetch_errors[url] = 'NotCached'
+            return cached.body if cached else None
+
+        headers = cached.conditional_headers() if cached else {}
+        error = None
+        for attempt in range(retries):
+            await self.bucket.acquire()
+            retry_after = None
+            started = self.fetch_started(attempt)
+            try:
+                async with session.get(url, headers=headers) as response:
+                    content = await response.read()
+                    latency = self.fetch_done(started, len(content))
+                    retry_after = self.check_response(response.status, response.headers, latency)
+                    if retry_after:
+                        self.bucket.hold(retry_after)
+                    if self.throttle:
+                        self.bucket.rate = self.throttle.rate
+                    response.raise_for_status()
+                    if response.status == 304 and cached:
+                        self.metrics.count('not_modified')
+                        return cached.body
+                    return self.store_response(url, content, response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    self.fetch_done(started)
+                    if self.throttle:
+                        self.throttle.on_error()
+                        self.bucket.rate = self.throttle.rate
+                self.logger.warning(f"Attempt {attempt + 1} failed for {url}: {e!r}")
+                error = self.error_class(e)
+                if attempt < retries - 1:
+                    await asyncio.sleep(self.retry_delay(attempt, retry_after))
+
+        self.fetch_failed(url, retries, error)
+        return None
+
+    async def get_page_async(self, session: aiohttp.ClientSession, url: str) -> Optional[BeautifulSoup]:
+        """Fetch and parse a page"""
+        content = await self.fetch_async(session, url)
+        if content is None:
+            return None
+        return self.parse_html(content)
+
+    async def extract_detailed_info_async(self, session: aiohttp.ClientSession, candidate: Dict) -> Dict:
+        """Async counterpart of extract_detailed_info"""
+        if not candidate.get('profile_url'):
+            return candidate
+
+        finished = self.finished_resume(candidate)
+        if finished is not None:
+            return finished
+
+        if self.state:
+            self.state.start_resume(candidate)
+
+        content = await self.fetch_async(session, candidate['profile_url'])
+        if content is not None:
+            candidate = self.parse_resume(candidate, content)
+
+        return self.finish_resume(candidate, content is not None)
+
+    async def get_listing_async(self, session: aiohttp.ClientSession, page: int) -> Optional[List[Dict]]:
+        """Async counterpart of get_listing"""
+        if self.state:
+            candidates = self.state.get_listing(page)
+            if candidates is not None:
+                return candidates
+            self.state.start_page(page)
+
+        url = f"{self.base_url}/resumes?page={page}"
+        content = await self.fetch_async(session, url)
+        candidates = self.parse_listing(content) if content else None
+
+        self.finish_listing(page, url, candidates)
+        return candidates
+
+    async def scrape_page_async(self, session: aiohttp.ClientSession, page: int) -> Optional[List[Dict]]:
+        """Scrape one listing page and all of its resumes"""
+        candidates = await self.get_listing_async(session, page)
+
+        if candidates is None:
+            return None
+
+        self.logger.info(f"Found {len(candidates)} candidates on page {page}")
+
+        return list(await asyncio.gather(
+            *(self.extract_detailed_info_async(session, candidate) for candidate in candidates)
+        ))
+
+    async def scrape_pages_async(self, start_page: int = 1, end_page: int = 93) -> List[Candidate]:
+        """Scrape multiple pages of candidates concurrently"""
+        all_candidates = []
+        self.bucket = TokenBucket(self.current_rate())
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(headers=dict(self.session.headers),
+                                         connector=connector, timeout=timeout) as session:
+            pages = range(start_page, end_page + 1)
+            tasks = [asyncio.create_task(self.scrape_page_async(session, page)) for page in pages]
+
+            # Collect in page order so output matches the sequential engine
+            for page, task in zip(pages, tasks):
+                candidates = await task
+                if candidates is None:
+                    continue
+
+                self.logger.info(f"Scraped page {page}/{end_page}")
+                self.collect_page(all_candidates, candidates, start_page, page)
+
+        return all_candidates
+
+    def scrape_pages(self, start_page: int = 1, end_page: int = 93) -> List[Candidate]:
+        """Scrape multiple pages of candidates"""
+        return asyncio.run(self.scrape_pages_async(start_page, end_page))
@@ -3,7 +3,7 @@
 Batch scraper for SmartJob.az - processes pages in smaller batches for better control
 """
 
-from smartjob_scraper import SmartJobScraper
+from smartjob_scraper import create_scraper_from_args, add_scraper_arguments
 import time
 import argparse
 
@@ -14,10 +14,12 @@ def main():
     parser.add_argument('--end-page', type=int, default=93, help='Ending page (default: 93)')
     parser.add_argument('--batch-delay', type=int, default=30, help='Seconds to wait between batches (default: 30)')
     parser.add_argument('--output-dir', default='scraped_data', help='Output directory')
+    add_scraper_arguments(parser)
     
     args = parser.parse_args()
     
-    scraper = SmartJobScraper(
+    scraper = create_scraper_from_args(
+        args,
         delay_range=(1, 3),
         output_dir=args.output_dir
     )
@@ -26,36 +28,50 @@ def main():
     print(f"Pages: {args.start_page} to {args.end_page}")
     print(f"Batch size: {args.batch_size} pages")
     print(f"Batch delay: {args.batch_delay} seconds")
+    if args.resume:
+        print(f"Resuming from: {scraper.state.path}")
     
     total_candidates = []
+    final_filename = f"all_candidates_pages_{args.start_page}_{args.end_page}"
+    if args.stream:
+        scraper.open_stream(final_filename)
     
     for start_page in range(args.start_page, args.end_page + 1, args.batch_size):
         end_page = min(start_page + args.batch_size - 1, args.end_page)
         
         print(f"\n--- Processing batch: pages {start_page} to {end_page} ---")
+        resumed = args.resume and scraper.state.is_complete(start_page, end_page)
         
         batch_candidates = scraper.scrape_pages(start_page, end_page)
         total_candidates.extend(batch_candidates)
         
         # Save batch results
         batch_filename = f"batch_pages_{start_page}_{end_page}"
-        scraper.save_data(batch_candidates, batch_filename)
+        if args.stream:
+            scraper.sink.checkpoint()
+        else:
+            scraper.save_data(batch_candidates, batch_filename)
         
         print(f"Batch completed: {len(batch_candidates)} candidates")
         print(f"Total so far: {len(total_candidates)} candidates")
         
         # Wait between batches (except for the last one)
-        if end_page < args.end_page:
+        if end_page < args.end_page and not resumed and not args.replay:
             print(f"Waiting {args.batch_delay} seconds before next batch...")
             time.sleep(args.batch_delay)
     
     # Save final combined results
-    final_filename = f"all_candidates_pages_{args.start_page}_{args.end_page}"
-    scraper.save_data(total_candidates, final_filename)
+    if args.stream:
+        scraper.close_stream(pretty_json=args.pretty_json)
+    else:
+        scraper.save_data(total_candidates, final_filename)
     
     print(f"\n✅ Scraping completed!")
     print(f"Total candidates scraped: {len(total_candidates)}")
-    print(f"Final data saved as: {final_filename}.json and {final_filename}.csv")
+    if args.incremental:
+        print(f"Unchanged candidates carried forward: {scraper.carried_forward}")
+    scraper.finish_run()
+    print(f"Final data saved as: {final_filename}.{'ndjson' if args.stream else 'json'} and {final_filename}.csv")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for SmartJob.az scraper engines
+
+Serves the recorded listing and resume pages in fixtures/ from a local HTTP
+stand-in for smartjob.az, with configurable latency, jitter and error
+injection, and runs the scraper engines against it. Every listing page is the
+recorded one with its resume links made unique per page, so N pages yield
+N x 10 distinct resumes. Each engine runs in a fresh process and reports
+records/second, p50/p99 request latency, parse time per page and peak RSS.
+Results are saved as JSON for comparing engines and catching regressions.
+
+Usage:
+    python benchmark.py [--pages 5] [--engines sync async pipeline] [--parsers bs4 lxml]
+                        [--latency 0.05] [--jitter 0.02] [--error-rate 0.01] [--output benchmark_results.json]
+    python benchmark.py --serve [--port 8000]
+        Only run the fixture server
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+RESUME_LINK = re.compile(r'/resume/([\w-]+)')
+PAGE_PREFIX = re.compile(r'^p\d+-')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; with Nagle on, keep-alive requests wait for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        if random.random() < server.error_rate:
+            self.send_body(503, b'')
+            return
+
+        url = urlparse(self.path)
+        if url.path == '/resumes':
+            page = int(parse_qs(url.query).get('page', ['1'])[0])
+            # Make resume links unique per page so every page has new resumes
+            body = RESUME_LINK.sub(lambda m: f'/resume/p{page}-{m.group(1)}', server.listing)
+            self.send_body(200, body.encode('utf-8'))
+        elif url.path.startswith('/resume/'):
+            body = server.resumes.get(PAGE_PREFIX.sub('', url.path.rsplit('/', 1)[-1]))
+            if body:
+                self.send_body(200, body)
+            else:
+                self.send_body(404, b'')
+        else:
+            self.send_body(404, b'')
+
+    def send_body(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                fixtures_dir=FIXTURES_DIR) -> ThreadingHTTPServer:
+    """HTTP server answering like smartjob.az from the recorded fixtures"""
+    fixtures_dir = Path(fixtures_dir)
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.listing = (fixtures_dir / 'listing.html').read_text(encoding='utf-8')
+    server.resumes = {path.stem: path.read_bytes() for path in (fixtures_dir / 'resumes').glob('*.html')}
+    return server
+
+
+def serve(port_queue, seed: int, **options):
+    """Run a fixture server, reporting its port through the queue"""
+    random.seed(seed)
+    server = make_server(**options)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class FixtureServer:
+    """Fixture server in a separate process, so it does not compete for the GIL"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.options = {'latency': latency, 'jitter': jitter, 'error_rate': error_rate}
+        self.seed = seed
+        self.process = None
+        self.url = None
+
+    def __enter__(self):
+        context = multiprocessing.get_context('spawn')
+        port_queue = context.Queue()
+        self.process = context.Process(target=serve, args=(port_queue, self.seed), kwargs=self.options, daemon=True)
+        self.process.start()
+        self.url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Percentile with linear interpolation between the closest ranks"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident set size of this process, or of its largest finished child"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_engine(result_queue, engine: str, parser: str, base_url: str, pages: int, **options):
+    """Scrape the fixture server with one engine and report its measurements"""
+    from run_metrics import RunMetrics
+    from smartjob_scraper import create_scraper
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        scraper = create_scraper(engine=engine, parser=parser, base_url=base_url, output_dir=output_dir,
+                                 delay_range=(0, 0), **options)
+        scraper.logger.setLevel(logging.ERROR)
+        scraper.metrics = RunMetrics(output_dir, interval=None, keep_samples=True)
+
+        started = time.perf_counter()
+        candidates = scraper.scrape_pages(1, pages)
+        elapsed = time.perf_counter() - started
+
+    metrics = scraper.metrics
+    fetch = metrics.samples['fetch']
+    parse = metrics.samples['parse']
+    result_queue.put({
+        'engine': engine,
+        'parser': parser,
+        'records': len(candidates),
+        'detailed_records': sum(1 for candidate in candidates if scraper.is_detailed(candidate)),
+        'requests': metrics.counters['requests'],
+        'retries': metrics.counters['retries'],
+        'failures': metrics.counters['failures'],
+        'wall_seconds': round(elapsed, 3),
+        'records_per_second': round(len(candidates) / elapsed, 2),
+        'requests_per_second': round(metrics.counters['requests'] / elapsed, 2),
+        'latency_ms': {
+            'mean': round(sum(fetch) / len(fetch) * 1000, 2) if fetch else 0.0,
+            'p50': round(percentile(fetch, 0.5) * 1000, 2),
+            'p99': round(percentile(fetch, 0.99) * 1000, 2),
+        },
+        'parse_us_per_page': {
+            'mean': round(sum(parse) / len(parse) * 1e6, 1) if parse else 0.0,
+            'p50': round(percentile(parse, 0.5) * 1e6, 1),
+            'p99': round(percentile(parse, 0.99) * 1e6, 1),
+        },
+        'peak_rss_mb': peak_rss_mb(),
+        'worker_peak_rss_mb': peak_rss_mb(children=True) if engine == 'pipeline' else None,
+    })
+
+
+def benchmark(engine: str, parser: str, base_url: str, pages: int, timeout: float = 600, **options) -> Dict:
+    """Run one engine in a fresh process, so peak RSS is its own
+
+    An engine whose process dies, or runs longer than timeout seconds, is
+    recorded with an error instead of measurements.
+    """
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=run_engine, args=(result_queue, engine, parser, base_url, pages), kwargs=options)
+    process.start()
+    deadline = time.monotonic() + timeout
+    error = None
+    while True:
+        # A process that had already exited before the wait has sent everything it will send
+        exited = process.exitcode is not None
+        try:
+            result = result_queue.get(timeout=1)
+            break
+        except queue.Empty:
+            if exited:
+                error = f"process exited with code {process.exitcode}"
+                break
+            if time.monotonic() > deadline:
+                process.terminate()
+                error = f"timed out after {timeout:.0f}s"
+                break
+    process.join()
+    if error:
+        return {'engine': engine, 'parser': parser, 'error': error}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SmartJob.az scraper engines against local fixtures')
+    parser.add_argument('--pages', type=int, default=5, help='Listing pages per run, 10 resumes each (default: 5)')
+    parser.add_argument('--engines', nargs='+', choices=['sync', 'async', 'pipeline'], default=['sync', 'async', 'pipeline'],
+                        help='Engines to run (default: all)')
+    parser.add_argument('--parsers', nargs='+', choices=['bs4', 'lxml'], default=['bs4'], help='Parser backends to run (default: bs4)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight for the async engines (default: 10)')
+    parser.add_argument('--rate', type=float, default=1000, help='Request rate cap for the async engines (default: 1000)')
+    parser.add_argument('--parse-workers', type=int, default=None, help='Parser processes for the pipeline engine (default: CPU count)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server response latency in seconds (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Random +/- latency variation in seconds (default: 0.02)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed of the fixture server (default: 1)')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds before a run counts as failed (default: 600)')
+    parser.add_argument('--output', default='benchmark_results.json', help='Results file (default: benchmark_results.json)')
+    parser.add_argument('--serve', action='store_true', help='Only run the fixture server')
+    parser.add_argument('--port', type=int, default=8000, help='Port for --serve (default: 8000)')
+
+    args = parser.parse_args()
+
+    server_options = {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate}
+
+    if args.serve:
+        random.seed(args.seed)
+        server = make_server(args.port, **server_options)
+        print(f"Serving fixtures on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    runs = []
+    with FixtureServer(seed=args.seed, **server_options) as server:
+        print(f"🧪 Fixture server at {server.url}: latency {args.latency}s ±{args.jitter}s, error rate {args.error_rate:.0%}")
+        for engine in args.engines:
+            for parser_backend in args.parsers:
+                options = {}
+                if engine != 'sync':
+                    options.update(concurrency=args.concurrency, rate=args.rate)
+                if engine == 'pipeline':
+                    options['parse_workers'] = args.parse_workers
+
+                result = benchmark(engine, parser_backend, server.url, args.pages, timeout=args.timeout, **options)
+                runs.append(result)
+                if 'error' in result:
+                    print(f"{engine:>8}/{parser_backend:<4} ❌ failed: {result['error']}")
+                    continue
+                print(f"{engine:>8}/{parser_backend:<4} {result['records_per_second']:8.1f} rec/s  "
+                      f"p50 {result['latency_ms']['p50']:7.1f}ms  p99 {result['latency_ms']['p99']:7.1f}ms  "
+                      f"parse {result['parse_us_per_page']['mean']:8.0f}µs/page  "
+                      f"RSS {result['peak_rss_mb']} MB  failures {result['failures']}")
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pages': args.pages,
+        'server': server_options,
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Inverted index and query tool for scraped SmartJob.az candidates
+
+`build` streams scraper output into a SQLite index with a posting list of
+candidate ids per skill, language, language+level, category and education
+level, plus sorted numeric indexes on salary and age. `query` intersects the
+posting lists and range scans for the given filters and only loads the
+matching records, so a search over the whole dataset takes milliseconds.
+
+Usage:
+    python candidate_index.py build full_scrape_results/smartjob_all_candidates_complete.json
+    python candidate_index.py query --skill Python --lang "İngilis>=B2" --salary-max 2000
+    python candidate_index.py query --category "Mühasibatlıq" --age-max 30 --count
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import time
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from consolidate import iter_records
+from crawl_state import CrawlState
+
+SCHEMA = """
+CREATE TABLE docs (
+    doc_id INTEGER PRIMARY KEY,
+    resume_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE postings (
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    doc_ids BLOB NOT NULL,
+    PRIMARY KEY (field, term)
+) WITHOUT ROWID;
+CREATE TABLE numbers (
+    field TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+NUMBERS_INDEX = "CREATE INDEX numbers_value ON numbers (field, value, doc_id)"
+
+# CEFR levels in ascending order; a native speaker ranks above C2
+LEVELS = {'a1': 1, 'a2': 2, 'b1': 3, 'b2': 4, 'c1': 5, 'c2': 6, 'ana dili': 7}
+# Descriptive levels mapped onto the same scale
+LEVEL_WORDS = {'zəif': 2, 'orta': 3, 'yaxşı': 4, 'əla': 5}
+
+LANGUAGE_FILTER = re.compile(r'^\s*(.+?)\s*(>=|<=|=)\s*(.+?)\s*$')
+
+
+def normalize(term: str) -> str:
+    """Case-insensitive form of a term; 'İngilis', 'ingilis' and 'INGILIS' are the same"""
+    return ' '.join(term.split()).casefold().replace('\u0307', '')
+
+
+def level_rank(level: str) -> int:
+    """Position of a language level on the CEFR scale, 0 when unknown"""
+    level = normalize(level)
+    if level in LEVELS:
+        return LEVELS[level]
+    match = re.search(r'\b([abc][12])\b', level)
+    if match:
+        return LEVELS[match.group(1)]
+    return LEVEL_WORDS.get(level, 0)
+
+
+def parse_number(text) -> Optional[int]:
+    """First integer in a field such as '1 200 AZN' or '55', ignoring digit grouping"""
+    if text is None:
+        return None
+    match = re.search(r'\d+(?:[  .,]\d{3})*', str(text))
+    return int(re.sub(r'\D', '', match.group())) if match else None
+
+
+def index_terms(candidate: Dict) -> Iterator[Tuple[str, str]]:
+    """(field, term) pairs a candidate is listed under"""
+    for skill in candidate.get('skills') or []:
+        yield 'skill', normalize(skill)
+    for language in candidate.get('languages') or []:
+        name = normalize(language.get('language', ''))
+        if name:
+            yield 'lang', name
+            yield 'lang_level', f"{name}|{level_rank(language.get('level', ''))}"
+    if candidate.get('category_name'):
+        yield 'category', normalize(candidate['category_name'])
+    if candidate.get('education_level'):
+        yield 'education', normalize(candidate['education_level'])
+
+
+def build_index(paths: Iterable, index_file) -> Dict[str, int]:
+    """Index scraper output files; a resume seen in an earlier file is skipped"""
+    index_file = Path(index_file)
+    tmp_file = index_file.with_suffix(index_file.suffix + '.tmp')
+    tmp_file.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(str(tmp_file))
+    conn.executescript(SCHEMA)
+
+    postings = defaultdict(lambda: array('I'))
+    seen = set()
+    skipped = 0
+    doc_id = 0
+    for path in paths:
+        for candidate in iter_records(Path(path)):
+            if not candidate.get('resume_id') and not candidate.get('profile_url'):
+                skipped += 1
+                continue
+            key = CrawlState.resume_key(candidate)
+            if key in seen:
+                skipped += 1
+                continue
+            seen.add(key)
+
+            conn.execute('INSERT INTO docs VALUES (?, ?, ?)',
+                         (doc_id, key, json.dumps(candidate, ensure_ascii=False)))
+            for field_term in set(index_terms(candidate)):
+                postings[field_term].append(doc_id)
+            for field in ('salary', 'age'):
+                value = parse_number(candidate.get(field))
+                if value is not None:
+                    conn.execute('INSERT INTO numbers VALUES (?, ?, ?)', (field, value, doc_id))
+            doc_id += 1
+
+    conn.executemany('INSERT INTO postings VALUES (?, ?, ?)',
+                     ((field, term, ids.tobytes()) for (field, term), ids in postings.items()))
+    conn.execute(NUMBERS_INDEX)
+    conn.execute('INSERT INTO meta VALUES (?, ?)', ('documents', str(doc_id)))
+    conn.execute('INSERT INTO meta VALUES (?, ?)', ('sources', json.dumps([str(path) for path in paths])))
+    conn.commit()
+    conn.close()
+    tmp_file.replace(index_file)
+
+    return {'documents': doc_id, 'terms': len(postings), 'skipped': skipped}
+
+
+class CandidateIndex:
+    def __init__(self, index_file):
+        if not Path(index_file).exists():
+            raise FileNotFoundError(f"Index not found: {index_file}")
+        self.conn = sqlite3.connect(f"file:{index_file}?mode=ro", uri=True)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return int(self.conn.execute("SELECT value FROM meta WHERE key = 'documents'").fetchone()[0])
+
+    def posting(self, field: str, term: str) -> Set[int]:
+        row = self.conn.execute('SELECT doc_ids FROM postings WHERE field = ? AND term = ?', (field, term)).fetchone()
+        if row is None:
+            return set()
+        ids = array('I')
+        ids.frombytes(row[0])
+        return set(ids)
+
+    def language(self, spec: str) -> Set[int]:
+        """Candidates matching 'LANGUAGE', 'LANGUAGE=LEVEL', 'LANGUAGE>=LEVEL' or 'LANGUAGE<=LEVEL'"""
+        match = LANGUAGE_FILTER.match(spec)
+        if not match:
+            return self.posting('lang', normalize(spec))
+
+        name, op, level = normalize(match.group(1)), match.group(2), level_rank(match.group(3))
+        if not level:
+            raise ValueError(f"Unknown language level in {spec!r}")
+        if op == '=':
+            ranks = [level]
+        elif op == '>=':
+            ranks = range(level, max(LEVELS.values()) + 1)
+        else:
+            ranks = range(1, level + 1)
+
+        ids = set()
+        for rank in ranks:
+            ids |= self.posting('lang_level', f"{name}|{rank}")
+        return ids
+
+    def number_range(self, field: str, low: Optional[int], high: Optional[int]) -> Set[int]:
+        rows = self.conn.execute(
+            'SELECT doc_id FROM numbers WHERE field = ? AND value BETWEEN ? AND ?',
+            (field, low if low is not None else -2 ** 63, high if high is not None else 2 ** 63 - 1)
+        )
+        return {doc_id for (doc_id,) in rows}
+
+    def search(self, skills: List[str] = (), languages: List[str] = (), category: Optional[str] = None,
+               education: Optional[str] = None, salary: Tuple[Optional[int], Optional[int]] = (None, None),
+               age: Tuple[Optional[int], Optional[int]] = (None, None)) -> List[int]:
+        """Ids of the candidates matching every given filter, in dataset order"""
+        filters = [lambda skill=skill: self.posting('skill', normalize(skill)) for skill in skills]
+        filters += [lambda spec=spec: self.language(spec) for spec in languages]
+        if category:
+            filters.append(lambda: self.posting('category', normalize(category)))
+        if education:
+            filters.append(lambda: self.posting('education', normalize(education)))
+        if salary != (None, None):
+            filters.append(lambda: self.number_range('salary', *salary))
+        if age != (None, None):
+            filters.append(lambda: self.number_range('age', *age))
+
+        if not filters:
+            return list(range(len(self)))
+
+        result = None
+        for get_ids in filters:
+            ids = get_ids()
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+        return sorted(result)
+
+    def records(self, doc_ids: List[int]) -> Iterator[Dict]:
+        """Load the records of the given ids"""
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT payload FROM docs WHERE doc_id IN ({','.join('?' * len(chunk))}) ORDER BY doc_id", chunk
+            )
+            for (payload,) in rows:
+                yield json.loads(payload)
+
+    def terms(self, field: str) -> List[Tuple[str, int]]:
+        """Terms of a field with their candidate counts, most common first"""
+        rows = self.conn.execute('SELECT term, LENGTH(doc_ids) / 4 FROM postings WHERE field = ?', (field,))
+        return sorted(rows, key=lambda row: (-row[1], row[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index and search scraped SmartJob.az candidates')
+    parser.add_argument('--index', default='scraped_data/candidate_index.db', help='Index file (default: scraped_data/candidate_index.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Index JSON, NDJSON or CSV scraper output')
+    build.add_argument('files', nargs='+', help='Scraper output files')
+
+    query = commands.add_parser('query', help='Search the index')
+    query.add_argument('--skill', action='append', default=[], help='Required skill (repeatable)')
+    query.add_argument('--lang', action='append', default=[],
+                       help='Required language, optionally with a level: "İngilis", "İngilis>=B2", "Rus=C1" (repeatable)')
+    query.add_argument('--category', default=None, help='Category name')
+    query.add_argument('--education', default=None, help='Education level')
+    query.add_argument('--salary-min', type=int, default=None, help='Minimum salary')
+    query.add_argument('--salary-max', type=int, default=None, help='Maximum salary')
+    query.add_argument('--age-min', type=int, default=None, help='Minimum age')
+    query.add_argument('--age-max', type=int, default=None, help='Maximum age')
+    query.add_argument('--limit', type=int, default=20, help='Maximum results to show, 0 for all (default: 20)')
+    query.add_argument('--count', action='store_true', help='Only print the number of matches')
+    query.add_argument('--json', action='store_true', help='Print matching records as NDJSON')
+
+    terms = commands.add_parser('terms', help='List indexed values of a field')
+    terms.add_argument('field', choices=['skill', 'lang', 'category', 'education'])
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        stats = build_index(args.files, args.index)
+        print(f"✅ Indexed {stats['documents']} candidates ({stats['terms']} terms) "
+              f"into {args.index} in {time.perf_counter() - started:.1f}s")
+        if stats['skipped']:
+            print(f"Skipped {stats['skipped']} duplicate or keyless records")
+        return
+
+    index = CandidateIndex(args.index)
+
+    if args.command == 'terms':
+        for term, count in index.terms(args.field):
+            print(f"{count:6d}  {term}")
+        index.close()
+        return
+
+    started = time.perf_counter()
+    try:
+        doc_ids = index.search(args.skill, args.lang, args.category, args.education,
+                               (args.salary_min, args.salary_max), (args.age_min, args.age_max))
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.count:
+        print(len(doc_ids))
+    else:
+        shown = doc_ids[:args.limit] if args.limit else doc_ids
+        for candidate in index.records(shown):
+            if args.json:
+                print(json.dumps(candidate, ensure_ascii=False))
+            else:
+                print(f"{candidate.get('name', ''):<30} {candidate.get('category_name', ''):<35} "
+                      f"{candidate.get('salary', '-'):<12} {candidate.get('profile_url', '')}")
+        if not args.json:
+            print(f"\n{len(doc_ids)} matches in {elapsed:.1f} ms" +
+                  (f" (showing {len(shown)})" if len(shown) < len(doc_ids) else ""))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
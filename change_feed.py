@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Per-run change feed for SmartJob.az output
+
+Every record is fingerprinted by hashing each field of its normalized form
+(empty values and the detail_error marker dropped, canonical JSON). The
+fingerprints of a snapshot are kept in NAME.manifest.json. Publishing the
+next snapshot under the same name compares it with that manifest and writes
+NAME.changes.ndjson, one JSON object per line:
+
+    {"op": "snapshot", "created_at": ..., "base": ..., "added": 3, "modified": 41, "removed": 2, "unchanged": 9254}
+    {"op": "add", "resume_id": ..., "hash": ..., "record": {...}}
+    {"op": "modify", "resume_id": ..., "hash": ..., "set": {"salary": "3 000 AZN"}, "unset": ["phone"]}
+    {"op": "remove", "resume_id": ...}
+
+"base" is the created_at of the manifest the feed was computed against, so a
+consumer can check that it applies feeds in order. Records without resume
+details (detail_error) only update the fields they have, and resumes missing
+from a run with failed listing pages are kept instead of reported as removed.
+
+Usage:
+    python change_feed.py publish FILE.json|FILE.ndjson
+        Compare with FILE.manifest.json, write FILE.changes.ndjson and the new manifest
+    python change_feed.py diff OLD.json NEW.json [--output FEED.ndjson]
+        Change feed between two snapshots
+    python change_feed.py apply BASE.json FEED.ndjson --output NEW.json
+        Apply a change feed to an earlier snapshot
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from crawl_state import CrawlState
+from streaming_writer import write_json_array
+
+FEED_SUFFIX = '.changes.ndjson'
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Fields that describe the crawl rather than the candidate
+IGNORED_FIELDS = ('detail_error',)
+
+
+def canonical(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def digest(value, size: int = 8) -> str:
+    return hashlib.blake2b(canonical(value), digest_size=size).hexdigest()
+
+
+def normalize(record: Dict) -> Dict:
+    """Content fields of a record; empty values count as absent"""
+    return {
+        key: value for key, value in record.items()
+        if key not in IGNORED_FIELDS and value not in (None, '', [], {})
+    }
+
+
+def fingerprint(record: Dict) -> Dict[str, str]:
+    """Hash of every content field"""
+    return {key: digest(value, 4) for key, value in sorted(normalize(record).items())}
+
+
+def record_hash(fields: Dict[str, str]) -> str:
+    """Stable content hash of a record, from its field hashes"""
+    return digest(fields)
+
+
+def manifest_paths(path) -> Tuple[Path, Path]:
+    """NAME.manifest.json and NAME.changes.ndjson of an output file"""
+    path = Path(path)
+    return path.with_name(path.stem + MANIFEST_SUFFIX), path.with_name(path.stem + FEED_SUFFIX)
+
+
+def load_manifest(path) -> Dict:
+    path = Path(path)
+    if not path.exists():
+        return {'created_at': None, 'records': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_manifest(records: Iterable[Dict]) -> Dict:
+    """Manifest of a snapshot, without comparing it to anything"""
+    _, manifest = diff(records, {})
+    return manifest
+
+
+def diff(records: Iterable[Dict], previous: Dict[str, Dict], keep_missing: bool = False) -> Tuple[List[Dict], Dict]:
+    """Change feed entries of records against the records of a previous manifest, and the new manifest
+
+    With keep_missing, resumes of the previous manifest that are not in records
+    are carried over instead of reported as removed.
+    """
+    changes = []
+    current = {}
+    unchanged = 0
+
+    for record in records:
+        key = CrawlState.resume_key(record)
+        if key in current:
+            continue
+
+        fields = fingerprint(record)
+        old = previous.get(key)
+        if old is not None and 'detail_error' in record:
+            # Only the listing fields were scraped; keep the rest of the previous version
+            fields = {**old['fields'], **fields}
+        entry = {'hash': record_hash(fields), 'fields': fields}
+        current[key] = entry
+
+        if old is None:
+            changes.append({'op': 'add', 'resume_id': key, 'hash': entry['hash'], 'record': record})
+        elif old['hash'] == entry['hash']:
+            unchanged += 1
+        else:
+            content = normalize(record)
+            changes.append({
+                'op': 'modify', 'resume_id': key, 'hash': entry['hash'],
+                'set': {field: content[field] for field in fields
+                        if field in content and old['fields'].get(field) != fields[field]},
+                'unset': [field for field in old['fields'] if field not in fields],
+            })
+
+    for key, entry in previous.items():
+        if key in current:
+            continue
+        if keep_missing:
+            current[key] = entry
+            unchanged += 1
+        else:
+            changes.append({'op': 'remove', 'resume_id': key})
+
+    counts = {op: sum(1 for change in changes if change['op'] == op) for op in ('add', 'modify', 'remove')}
+    manifest = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'counts': {'added': counts['add'], 'modified': counts['modify'], 'removed': counts['remove'],
+                   'unchanged': unchanged},
+        'records': current,
+    }
+    return changes, manifest
+
+
+def write_feed(path, changes: List[Dict], manifest: Dict, base=None):
+    """Write a change feed: the snapshot header line, then one line per change"""
+    with open(path, 'w', encoding='utf-8') as f:
+        header = {'op': 'snapshot', 'created_at': manifest['created_at'], 'base': base, **manifest['counts']}
+        for entry in [header] + changes:
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write('\n')
+
+
+def save_manifest(path, manifest: Dict):
+    """Replace a manifest atomically"""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def publish(records: Iterable[Dict], path, keep_missing: bool = False) -> Dict:
+    """Write the change feed of an output file against its previous manifest, then the new manifest
+
+    Returns the counts of the feed.
+    """
+    manifest_file, feed_file = manifest_paths(path)
+    previous = load_manifest(manifest_file)
+    changes, manifest = diff(records, previous['records'], keep_missing=keep_missing)
+    write_feed(feed_file, changes, manifest, base=previous['created_at'])
+    save_manifest(manifest_file, manifest)
+    return manifest['counts']
+
+
+def read_feed(path) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply(records: Iterable[Dict], changes: Iterable[Dict]) -> List[Dict]:
+    """Apply change feed entries to the records of an earlier snapshot
+
+    Changed records keep their place, added records are appended.
+    """
+    merged = {}
+    for record in records:
+        merged.setdefault(CrawlState.resume_key(record), dict(record))
+    for change in changes:
+        key = change.get('resume_id')
+        if change['op'] == 'add':
+            merged[key] = dict(change['record'])
+        elif change['op'] == 'modify':
+            record = merged.setdefault(key, {})
+            record.update(change['set'])
+            for field in change['unset']:
+                record.pop(field, None)
+        elif change['op'] == 'remove':
+            merged.pop(key, None)
+    return list(merged.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Change feeds between SmartJob.az snapshots')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    publisher = commands.add_parser('publish', help='Compare an output file with its manifest and write its change feed')
+    publisher.add_argument('file', help='JSON or NDJSON scraper output')
+    publisher.add_argument('--keep-missing', action='store_true',
+                           help='Keep resumes that are not in the file instead of reporting them as removed')
+
+    differ = commands.add_parser('diff', help='Change feed between two snapshots')
+    differ.add_argument('old', help='Earlier JSON, NDJSON or CSV output')
+    differ.add_argument('new', help='Later JSON, NDJSON or CSV output')
+    differ.add_argument('--output', default=None, help='Feed file (default: NEW.changes.ndjson)')
+
+    applier = commands.add_parser('apply', help='Apply a change feed to an earlier snapshot')
+    applier.add_argument('base', help='Snapshot the feed was computed against')
+    applier.add_argument('feed', help='Change feed (NDJSON)')
+    applier.add_argument('--output', required=True, help='JSON file to write')
+
+    args = parser.parse_args()
+
+    from consolidate import iter_records
+
+    if args.command == 'publish':
+        counts = publish(iter_records(Path(args.file)), args.file, keep_missing=args.keep_missing)
+        manifest_file, feed_file = manifest_paths(args.file)
+        print(f"✅ {feed_file}: " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+        print(f"Manifest: {manifest_file}")
+
+    elif args.command == 'diff':
+        previous = build_manifest(iter_records(Path(args.old)))
+        changes, manifest = diff(iter_records(Path(args.new)), previous['records'])
+        feed_file = args.output or manifest_paths(args.new)[1]
+        write_feed(feed_file, changes, manifest)
+        print(f"✅ {feed_file}: " + ", ".join(f"{count} {name}" for name, count in manifest['counts'].items()))
+
+    elif args.command == 'apply':
+        feed = read_feed(args.feed)
+        header = next(feed, None)
+        if header is None or header['op'] != 'snapshot':
+            parser.error(f"{args.feed} is not a change feed")
+        records = apply(iter_records(Path(args.base)), feed)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_json_array(records, f)
+        print(f"✅ Applied {sum(header[name] for name in ('added', 'modified', 'removed'))} changes: "
+              f"{len(records)} candidates written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
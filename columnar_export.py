@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Columnar export for SmartJob.az
+
+Writes candidate records as Parquet or Arrow IPC (Feather) instead of CSV
+cells holding JSON strings. Low-cardinality fields such as category_name,
+education_level and language levels are dictionary-encoded, and skills,
+social_links, languages, education and experience are stored as nested
+list/struct columns, so loading the data needs no per-row json.loads.
+
+Requires pyarrow (pip install pyarrow).
+
+Usage:
+    python columnar_export.py FILE.json [FILE.ndjson FILE.csv ...] [--format parquet|arrow]
+        Convert existing scraper output to columnar files
+"""
+
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Fields save_data packs into JSON strings inside CSV cells
+NESTED_FIELDS = ('skills', 'social_links', 'languages', 'education', 'experience')
+
+
+def candidate_schema():
+    """Arrow schema of a candidate record"""
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('name', pa.string()),
+        ('phone', pa.string()),
+        ('salary', pa.string()),
+        ('age', pa.string()),
+        ('job_category', category),
+        ('category_name', category),
+        ('work_experience', category),
+        ('education_level', category),
+        ('profile_url', pa.string()),
+        ('resume_id', pa.string()),
+        ('last_updated', pa.string()),
+        ('skills', pa.list_(pa.string())),
+        ('social_links', pa.list_(pa.struct([
+            ('platform', category),
+            ('url', pa.string()),
+        ]))),
+        ('about', pa.string()),
+        ('languages', pa.list_(pa.struct([
+            ('language', pa.string()),
+            ('level', category),
+        ]))),
+        ('education', pa.list_(pa.struct([
+            ('level', pa.string()),
+            ('institution', pa.string()),
+            ('year', pa.string()),
+            ('faculty', pa.string()),
+            ('field', pa.string()),
+        ]))),
+        ('experience', pa.list_(pa.struct([
+            ('company', pa.string()),
+            ('duration', pa.string()),
+            ('position', pa.string()),
+        ]))),
+        # Error class of a record without resume details
+        ('detail_error', category),
+    ])
+
+
+def to_table(candidates: List[Dict]):
+    """Build an Arrow table from candidate dicts"""
+    import pyarrow as pa
+
+    return pa.Table.from_pylist(candidates, schema=candidate_schema())
+
+
+def drop_nulls(value):
+    """Remove the null fields a columnar schema adds to records that lack them"""
+    if isinstance(value, dict):
+        return {key: drop_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [drop_nulls(item) for item in value]
+    return value
+
+
+def to_records(table) -> List[Dict]:
+    """Convert a table back to candidate dicts"""
+    return [drop_nulls(record) for record in table.to_pylist()]
+
+
+def write_table(table, path, fmt: str = 'parquet') -> Path:
+    """Write a table as Parquet or Arrow IPC"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+    path = Path(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression='zstd')
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression='zstd')
+    return path
+
+
+def iter_batches(candidates: Iterable[Dict], batch_size: int = 10000):
+    """Convert candidate dicts to Arrow record batches of batch_size rows"""
+    import pyarrow as pa
+
+    schema = candidate_schema()
+    batch = []
+    for candidate in candidates:
+        batch.append(candidate)
+        if len(batch) == batch_size:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+
+def write_records(candidates: Iterable[Dict], path, fmt: str = 'parquet', batch_size: int = 10000) -> int:
+    """Write candidate dicts as Parquet or Arrow IPC, converting batch_size records at a time
+
+    Parquet is written batch by batch. An Arrow IPC file allows one dictionary
+    per column, so its batches are collected in Arrow memory and written with
+    unified dictionaries. Returns the number of records written.
+    """
+    import pyarrow as pa
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        count = 0
+        with pq.ParquetWriter(path, candidate_schema(), compression='zstd') as writer:
+            for batch in iter_batches(candidates, batch_size):
+                writer.write_batch(batch)
+                count += batch.num_rows
+        return count
+
+    table = pa.Table.from_batches(list(iter_batches(candidates, batch_size)), schema=candidate_schema())
+    write_table(table.unify_dictionaries(), path, fmt)
+    return table.num_rows
+
+
+def read_table(path):
+    """Read a table written by write_table"""
+    path = Path(path)
+    if path.suffix == FORMATS['parquet']:
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+
+    import pyarrow.feather as feather
+    return feather.read_table(path)
+
+
+def load_records(path) -> List[Dict]:
+    """Load candidates from JSON, NDJSON or CSV scraper output"""
+    path = Path(path)
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.suffix == '.json':
+            return json.load(f)
+        if path.suffix == '.ndjson':
+            return [json.loads(line) for line in f if line.strip()]
+        if path.suffix == '.csv':
+            records = []
+            for row in csv.DictReader(f):
+                record = {}
+                for key, value in row.items():
+                    if value == '':
+                        continue
+                    record[key] = json.loads(value) if key in NESTED_FIELDS else value
+                records.append(record)
+            return records
+
+    raise ValueError(f"Unsupported input file: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert SmartJob.az output to Parquet or Arrow IPC')
+    parser.add_argument('files', nargs='+', help='JSON, NDJSON or CSV files written by the scraper')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet', help='Output format (default: parquet)')
+    parser.add_argument('--output-dir', default=None, help='Output directory (default: next to each input)')
+
+    args = parser.parse_args()
+
+    for path in args.files:
+        path = Path(path)
+        output_dir = Path(args.output_dir) if args.output_dir else path.parent
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        table = to_table(load_records(path))
+        output = write_table(table, output_dir / f"{path.stem}{FORMATS[args.format]}", args.format)
+        print(f"✅ {path} -> {output} ({table.num_rows} candidates)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Consolidate overlapping SmartJob.az result files
+
+Merges batch_*, candidates_pages_*, progress_* and other scraper output into
+one deduplicated dataset. Files are stream-parsed one record at a time and
+deduplicated through an on-disk SQLite table, so memory use stays flat no
+matter how many runs are merged. For each resume the record with the newest
+last_updated wins, and among equally fresh records the most complete one.
+
+Usage:
+    python consolidate.py full_scrape_results [more dirs or files ...] [--output NAME] [--pretty-json]
+"""
+
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from columnar_export import NESTED_FIELDS
+from crawl_state import CrawlState
+from smartjob_scraper import SmartJobScraper
+from streaming_writer import StreamingWriter
+
+SEPARATORS = re.compile(r'[\s,]*')
+
+# Files written next to the records that hold something else
+NOT_RECORDS = ('run_metrics.json', 'benchmark_results.json', 'failed.ndjson')
+NOT_RECORDS_SUFFIXES = ('.manifest.json', '.changes.ndjson')
+
+SCHEMA = """
+CREATE TABLE records (
+    key TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    updated TEXT NOT NULL,
+    completeness INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX records_seq ON records (seq);
+"""
+
+
+def iter_json_array(f, chunk_size: int = 64 * 1024) -> Iterator[Dict]:
+    """Yield the elements of a JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        if not eof and len(buffer) - pos < chunk_size:
+            chunk = f.read(chunk_size)
+            if chunk:
+                buffer = buffer[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+
+        pos = SEPARATORS.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if eof:
+                if started:
+                    raise ValueError("Unterminated JSON array")
+                return
+            continue
+
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+
+        if buffer[pos] == ']':
+            return
+
+        try:
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Record spans beyond the buffer - read more and retry
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield record
+
+
+def iter_records(path: Path) -> Iterator[Dict]:
+    """Stream the candidates of a JSON, NDJSON or CSV output file"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.suffix == '.json':
+            yield from iter_json_array(f)
+        elif path.suffix == '.ndjson':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.suffix == '.csv':
+            for row in csv.DictReader(f):
+                yield {
+                    key: json.loads(value) if key in NESTED_FIELDS else value
+                    for key, value in row.items()
+                    if value != ''
+                }
+        else:
+            raise ValueError(f"Unsupported input file: {path}")
+
+
+def is_json_array(path: Path) -> bool:
+    """Whether a JSON file holds an array, judged by its first character"""
+    with open(path, encoding='utf-8') as f:
+        return f.read(64 * 1024).lstrip()[:1] in ('[', '')
+
+
+def is_record_file(file: Path) -> bool:
+    """Whether a file in an output directory holds candidate records"""
+    if file.suffix not in ('.json', '.ndjson', '.csv') or file.name in NOT_RECORDS:
+        return False
+    return not file.name.endswith(NOT_RECORDS_SUFFIXES)
+
+
+def collect_inputs(paths: List[str]) -> List[Path]:
+    """Expand directories, preferring JSON/NDJSON over the CSV twin of the same file
+
+    Metrics, manifests, change feeds and JSON files that are not an array are skipped.
+    """
+    inputs = []
+    for path in map(Path, paths):
+        if not path.is_dir():
+            inputs.append(path)
+            continue
+
+        files = {}
+        for file in sorted(path.iterdir()):
+            if is_record_file(file):
+                files.setdefault(file.stem, []).append(file)
+        for candidates in files.values():
+            preferred = [file for file in candidates if file.suffix != '.csv']
+            inputs.extend(preferred or candidates)
+
+    records = []
+    for path in inputs:
+        if path.suffix == '.json' and not is_json_array(path):
+            print(f"⚠️  Skipping {path}: not a JSON array of records")
+            continue
+        records.append(path)
+    return records
+
+
+def freshness(record: Dict) -> str:
+    """Sortable form of last_updated (dd.mm.yyyy)"""
+    try:
+        return datetime.strptime(record.get('last_updated', ''), '%d.%m.%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        return ''
+
+
+def completeness(record: Dict) -> int:
+    """Number of non-empty fields"""
+    return sum(1 for value in record.values() if value not in (None, '', [], {}))
+
+
+class Consolidator:
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(SCHEMA)
+        self.read = 0
+        self.skipped = 0
+
+    def add(self, record: Dict):
+        """Keep a record if it is the best seen so far for its resume"""
+        self.read += 1
+        if not record.get('resume_id') and not record.get('profile_url'):
+            self.skipped += 1
+            return
+
+        self.conn.execute(
+            'INSERT INTO records (key, seq, updated, completeness, payload) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET updated = excluded.updated, '
+            'completeness = excluded.completeness, payload = excluded.payload '
+            'WHERE (excluded.updated, excluded.completeness) > (records.updated, records.completeness)',
+            (CrawlState.resume_key(record), self.read, freshness(record), completeness(record),
+             json.dumps(record, ensure_ascii=False))
+        )
+        if self.read % 1000 == 0:
+            self.conn.commit()
+
+    def add_file(self, path: Path) -> int:
+        before = self.read
+        for record in iter_records(path):
+            self.add(record)
+        self.conn.commit()
+        return self.read - before
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Merged records in order of first appearance"""
+        for (payload,) in self.conn.execute('SELECT payload FROM records ORDER BY seq'):
+            yield json.loads(payload)
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge and deduplicate SmartJob.az result files')
+    parser.add_argument('inputs', nargs='+', help='Result files or directories (JSON, NDJSON or CSV)')
+    parser.add_argument('--output-dir', default='consolidated', help='Output directory (default: consolidated)')
+    parser.add_argument('--output', default='smartjob_candidates_consolidated', help='Output file name without extension')
+    parser.add_argument('--pretty-json', action='store_true', help='Also write the pretty JSON array')
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    inputs = collect_inputs(args.inputs)
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as work_dir:
+        consolidator = Consolidator(Path(work_dir) / 'consolidate.db')
+        for path in inputs:
+            count = consolidator.add_file(path)
+            print(f"📄 {path}: {count} records")
+
+        writer = StreamingWriter(output_dir, args.output, SmartJobScraper.PRIORITY_FIELDS)
+        for record in consolidator:
+            writer.write(record)
+        if args.pretty_json:
+            writer.finalize_json()
+        else:
+            writer.close()
+
+        print(f"\n✅ Read {consolidator.read} records from {len(inputs)} files")
+        if consolidator.skipped:
+            print(f"⚠️  Skipped {consolidator.skipped} records without resume_id or profile_url")
+        print(f"Unique candidates: {writer.count}")
+        print(f"Saved to: {writer.ndjson_file} and {writer.csv_file}")
+        consolidator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Freshness-prioritized crawl of SmartJob.az under a request budget
+
+A plain crawl walks pages in order and fetches every resume, so a run that
+stops early or is capped always covers the same low page numbers. The
+frontier crawl first fetches the listing pages, which carry the card fields
+of every candidate, and then fetches resumes in priority order (preferred
+categories, never-seen resumes, most recently updated) until the request
+budget is spent. Resumes that were not fetched are kept as listing cards.
+With --resume, the next run skips finished resumes and spends its budget on
+the next most valuable ones.
+
+Usage:
+    python crawl_frontier.py --budget 500 [--budget-per-hour 300]
+                             [--priority category new fresh] [--prefer-category NAME]
+                             [--incremental SNAPSHOT] [--resume]
+    python crawl_frontier.py --listing-only
+        Capture the card fields of all 93 pages (93 requests)
+"""
+
+import argparse
+import heapq
+import itertools
+import time
+from collections import deque
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from consolidate import freshness
+from crawl_state import CrawlState
+from records import Candidate
+from smartjob_scraper import SmartJobScraper, add_scraper_arguments, create_scraper_from_args
+
+# Criteria a frontier can order resumes by; page order always breaks ties
+PRIORITIES = ('category', 'new', 'fresh')
+
+
+class RequestBudget:
+    """Caps the requests of a run, in total and per sliding hour"""
+
+    def __init__(self, total: Optional[int] = None, per_hour: Optional[int] = None, window: float = 3600):
+        self.total = total
+        self.per_hour = per_hour
+        self.window = window
+        self.spent = 0
+        self.recent = deque()
+
+    def exhausted(self) -> bool:
+        return self.total is not None and self.spent >= self.total
+
+    def remaining(self) -> Optional[int]:
+        return None if self.total is None else max(self.total - self.spent, 0)
+
+    def wait(self) -> float:
+        """Sleep until the hourly cap allows another request; returns the seconds waited"""
+        if not self.per_hour:
+            return 0.0
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            while self.recent and self.recent[0] <= now - self.window:
+                self.recent.popleft()
+            if len(self.recent) < self.per_hour:
+                return waited
+            delay = self.recent[0] + self.window - now
+            time.sleep(delay)
+            waited += delay
+
+    def spend(self, requests: int):
+        self.spent += requests
+        self.recent.extend([time.monotonic()] * requests)
+
+    def take(self) -> bool:
+        """Charge one request attempt, waiting for the hourly cap; False once the total is spent"""
+        if self.exhausted():
+            return False
+        self.wait()
+        self.spend(1)
+        return True
+
+
+class Frontier:
+    """Priority queue of resumes waiting to be fetched"""
+
+    def __init__(self, order: Iterable[str] = PRIORITIES, categories: Iterable[str] = (), seen: Iterable[str] = ()):
+        self.order = tuple(order)
+        unknown = set(self.order) - set(PRIORITIES)
+        if unknown:
+            raise ValueError(f"Unknown priority: {', '.join(sorted(unknown))}")
+        self.categories = {category.casefold() for category in categories}
+        self.seen = set(seen)
+        self._heap = []
+        self._counter = itertools.count()
+
+    def priority(self, page: int, index: int, card: Dict) -> Tuple:
+        """Sort key of a card; smaller is fetched first"""
+        criteria = {
+            'category': 0 if (card.get('category_name') or '').casefold() in self.categories else 1,
+            'new': 1 if CrawlState.resume_key(card) in self.seen else 0,
+            # Most recent first; cards without a date go last
+            'fresh': -date.fromisoformat(freshness(card)).toordinal() if freshness(card) else 0,
+        }
+        return tuple(criteria[name] for name in self.order) + (page, index)
+
+    def push(self, page: int, index: int, card: Dict):
+        heapq.heappush(self._heap, (self.priority(page, index, card), next(self._counter), page, index, card))
+
+    def pop(self) -> Tuple[int, int, Dict]:
+        _, _, page, index, card = heapq.heappop(self._heap)
+        return page, index, card
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def crawl(scraper: SmartJobScraper, start_page: int, end_page: int, frontier: Frontier, budget: RequestBudget,
+          listing_only: bool = False) -> List[Candidate]:
+    """Fetch all listing pages, then resumes in frontier order until the budget is spent
+
+    Returns the records in page order, like scrape_pages. Resumes that were not
+    fetched are kept as their listing cards. The scraper charges every request
+    attempt to the budget and gives up on a page or resume, retries included,
+    once the budget is spent.
+    """
+    logger = scraper.logger
+    scraper.budget = budget
+    pages = {}
+    for page in range(start_page, end_page + 1):
+        if budget.exhausted():
+            logger.warning(f"Request budget spent before page {page}; pages {page}-{end_page} are not included")
+            break
+        cards = scraper.get_listing(page)
+        if cards is not None:
+            logger.info(f"Found {len(cards)} candidates on page {page}")
+            pages[page] = list(cards)
+
+    if not listing_only:
+        for page, cards in pages.items():
+            for index, card in enumerate(cards):
+                finished = scraper.finished_resume(card)
+                if finished is not None:
+                    cards[index] = finished
+                elif card.get('profile_url'):
+                    frontier.push(page, index, card)
+
+        queued = len(frontier)
+        logger.info(f"{queued} resumes queued, budget left: {budget.remaining() if budget.total is not None else 'unlimited'}")
+        while frontier and not budget.exhausted():
+            page, index, card = frontier.pop()
+            logger.info(f"Processing resume {queued - len(frontier)}/{queued} (page {page}): {card.get('name', 'Unknown')}")
+            pages[page][index] = scraper.extract_detailed_info(card)
+            scraper.pause()
+
+        if frontier:
+            logger.info(f"Request budget spent; {len(frontier)} resumes kept as listing cards")
+
+    all_candidates = []
+    for page in sorted(pages):
+        scraper.collect_page(all_candidates, pages[page], start_page, page, save_progress=False)
+    return all_candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Freshness-prioritized SmartJob.az crawl under a request budget')
+    parser.add_argument('--start-page', type=int, default=1, help='Starting page (default: 1)')
+    parser.add_argument('--end-page', type=int, default=93, help='Ending page (default: 93)')
+    parser.add_argument('--budget', type=int, default=None, help='Maximum requests in this run (default: unlimited)')
+    parser.add_argument('--budget-per-hour', type=int, default=None, help='Maximum requests in any hour (default: unlimited)')
+    parser.add_argument('--priority', nargs='+', choices=PRIORITIES, default=list(PRIORITIES),
+                        help='Resume order criteria, most important first (default: category new fresh)')
+    parser.add_argument('--prefer-category', action='append', default=[], help='Category fetched first (repeatable)')
+    parser.add_argument('--listing-only', action='store_true', help='Only fetch listing pages and save the card fields')
+    parser.add_argument('--output-dir', default='frontier_results', help='Output directory (default: frontier_results)')
+    parser.add_argument('--delay', type=float, nargs=2, default=[1, 3], help='Delay range between requests (default: 1 3)')
+    parser.add_argument('--base-url', default='https://smartjob.az', help='Site to crawl (default: https://smartjob.az)')
+    add_scraper_arguments(parser)
+
+    args = parser.parse_args()
+    if args.engine != 'sync':
+        parser.error("the frontier crawl fetches one page at a time; use --engine sync")
+
+    scraper = create_scraper_from_args(args, delay_range=tuple(args.delay), output_dir=args.output_dir,
+                                       base_url=args.base_url)
+    budget = RequestBudget(args.budget, args.budget_per_hour)
+    frontier = Frontier(args.priority, args.prefer_category, seen=scraper.previous)
+
+    filename = f"smartjob_{'listing' if args.listing_only else 'frontier'}_pages_{args.start_page}-{args.end_page}"
+    print(f"🚀 Frontier crawl of pages {args.start_page}-{args.end_page}")
+    print(f"Budget: {args.budget or 'unlimited'} requests" +
+          (f", at most {args.budget_per_hour} per hour" if args.budget_per_hour else ""))
+    print("Listing pages only" if args.listing_only else f"Resume order: {', '.join(args.priority)}")
+    if args.stream:
+        scraper.open_stream(filename)
+
+    candidates = crawl(scraper, args.start_page, args.end_page, frontier, budget, listing_only=args.listing_only)
+
+    if args.stream:
+        scraper.close_stream(pretty_json=args.pretty_json)
+    else:
+        scraper.save_data(candidates, filename)
+
+    detailed = sum(1 for candidate in candidates if scraper.is_detailed(candidate))
+    print(f"\n✅ Frontier crawl completed: {len(candidates)} candidates, {detailed} with resume details")
+    print(f"Requests made: {budget.spent}" + (f" of {args.budget}" if args.budget else ""))
+    if len(frontier):
+        print(f"Resumes left for the next run (use --resume): {len(frontier)}")
+    if args.incremental:
+        print(f"Unchanged candidates carried forward: {scraper.carried_forward}")
+    scraper.finish_run()
+    print(f"Data saved to: {args.output_dir}/{filename}.{'ndjson' if args.stream else 'json'} and {args.output_dir}/{filename}.csv")
+
+
+if __name__ == "__main__":
+    main()
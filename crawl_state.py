@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Durable crawl state for SmartJob.az
+
+Records every listing page and every resume in a SQLite database (WAL mode)
+with its status, attempt count, timestamp and parsed payload. A crawl started
+with --resume reuses finished work from the database and restarts at the
+request that was interrupted. Failed pages and resumes keep the class of their
+last error (e.g. "HTTP 503", "ConnectTimeout").
+
+Whether or not a crawl state is kept, failures also go to the dead-letter log
+OUTPUT_DIR/failed.ndjson, one JSON object per failed or recovered page and
+resume. It is the queue that retry_failed.py re-fetches.
+
+Usage:
+    python crawl_state.py [STATE_FILE]
+        Print a summary of a state database
+    python crawl_state.py [STATE_FILE] --failed
+        List the failed pages and resumes with their error and attempt count
+    python crawl_state.py OUTPUT_DIR/failed.ndjson
+        List the failed pages and resumes of a dead-letter log
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    candidates TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    profile_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    payload TEXT,
+    error TEXT
+);
+"""
+
+# Status values
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+# Dead-letter log written next to the output of every run
+DEAD_LETTERS = 'failed.ndjson'
+
+
+def now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class CrawlState:
+    def __init__(self, path, resume: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        
+        # State files of earlier versions have no error column
+        for table in ('pages', 'resumes'):
+            columns = {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+            if 'error' not in columns:
+                self.conn.execute(f'ALTER TABLE {table} ADD COLUMN error TEXT')
+
+        if not resume:
+            self.reset()
+
+    def reset(self):
+        """Forget all recorded progress"""
+        with self.conn:
+            self.conn.execute('DELETE FROM pages')
+            self.conn.execute('DELETE FROM resumes')
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def resume_key(candidate: Dict) -> str:
+        return candidate.get('resume_id') or candidate['profile_url']
+
+    def get_listing(self, page: int) -> Optional[List[Dict]]:
+        """Candidate cards of a finished listing page"""
+        row = self.conn.execute(
+            'SELECT candidates FROM pages WHERE page = ? AND status = ?', (page, DONE)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def start_page(self, page: int):
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO pages (page, status, attempts, updated_at) VALUES (?, ?, 1, ?) '
+                'ON CONFLICT(page) DO UPDATE SET status = excluded.status, '
+                'attempts = attempts + 1, updated_at = excluded.updated_at',
+                (page, IN_PROGRESS, now())
+            )
+
+    def finish_page(self, page: int, candidates: Optional[List[Dict]], error: Optional[str] = None):
+        """Record listing cards, or a failure with its error class when candidates is None"""
+        payload = None if candidates is None else json.dumps(candidates, ensure_ascii=False)
+        with self.conn:
+            self.conn.execute(
+                'UPDATE pages SET status = ?, updated_at = ?, candidates = ?, error = ? WHERE page = ?',
+                (FAILED if candidates is None else DONE, now(), payload,
+                 error or 'FetchError' if candidates is None else None, page)
+            )
+
+    def fail_pages(self, pages: Iterable[int], error: str):
+        """Mark pages as failed whatever their status, e.g. when a whole batch was lost"""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO pages (page, status, attempts, updated_at, error) VALUES (?, ?, 0, ?, ?) '
+                'ON CONFLICT(page) DO UPDATE SET status = excluded.status, '
+                'updated_at = excluded.updated_at, error = excluded.error',
+                [(page, FAILED, now(), error) for page in pages]
+            )
+
+    def get_resume(self, candidate: Dict) -> Optional[Dict]:
+        """Detailed record of a finished resume"""
+        row = self.conn.execute(
+            'SELECT payload FROM resumes WHERE resume_id = ? AND status = ?',
+            (self.resume_key(candidate), DONE)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def start_resume(self, candidate: Dict):
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO resumes (resume_id, profile_url, status, attempts, updated_at) '
+                'VALUES (?, ?, ?, 1, ?) '
+                'ON CONFLICT(resume_id) DO UPDATE SET status = excluded.status, '
+                'attempts = attempts + 1, updated_at = excluded.updated_at',
+                (self.resume_key(candidate), candidate['profile_url'], IN_PROGRESS, now())
+            )
+
+    def finish_resume(self, candidate: Dict, done: bool, error: Optional[str] = None):
+        """Record the outcome of a resume fetch with the record it produced"""
+        with self.conn:
+            self.conn.execute(
+                'UPDATE resumes SET status = ?, updated_at = ?, payload = ?, error = ? WHERE resume_id = ?',
+                (DONE if done else FAILED, now(), json.dumps(candidate, ensure_ascii=False),
+                 None if done else error or 'FetchError', self.resume_key(candidate))
+            )
+
+    def failed_pages(self) -> List[Tuple[int, int, str]]:
+        """Dead-letter listing pages as (page, attempts, error)"""
+        return self.conn.execute(
+            "SELECT page, attempts, COALESCE(error, 'FetchError') FROM pages WHERE status = ? ORDER BY page", (FAILED,)
+        ).fetchall()
+
+    def failed_resumes(self) -> List[Tuple[Dict, int, str]]:
+        """Dead-letter resumes as (record, attempts, error); the record holds the listing card fields"""
+        return [
+            (json.loads(payload), attempts, error)
+            for payload, attempts, error in self.conn.execute(
+                "SELECT payload, attempts, COALESCE(error, 'FetchError') FROM resumes "
+                "WHERE status = ? ORDER BY rowid", (FAILED,)
+            )
+        ]
+
+    def listing_positions(self) -> Dict[str, Tuple[int, int]]:
+        """Page and position of every candidate on a finished listing page"""
+        positions = {}
+        for page, candidates in self.conn.execute('SELECT page, candidates FROM pages WHERE status = ?', (DONE,)):
+            for index, candidate in enumerate(json.loads(candidates)):
+                positions.setdefault(self.resume_key(candidate), (page, index))
+        return positions
+
+    def is_complete(self, start_page: int, end_page: int) -> bool:
+        """Whether every page in the range and all of its resumes are finished"""
+        for page in range(start_page, end_page + 1):
+            candidates = self.get_listing(page)
+            if candidates is None:
+                return False
+            if any(self.get_resume(candidate) is None for candidate in candidates):
+                return False
+        return True
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Counts of pages and resumes by status"""
+        return {
+            table: dict(self.conn.execute(f'SELECT status, COUNT(*) FROM {table} GROUP BY status'))
+            for table in ('pages', 'resumes')
+        }
+
+
+class DeadLetters:
+    """Append-only log of the listing pages and resumes that could not be fetched
+
+    Each line records a failure with its error class, or with "error": null the
+    recovery of an earlier failure; the last line of a page or resume wins. The
+    file is only created by the first failure.
+    """
+
+    def __init__(self, path, resume: bool = False):
+        self.path = Path(path)
+        if not resume and self.path.exists():
+            self.path.unlink()
+        # Last entry of every page and resume that is still failed
+        self.failed = {}
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self.apply(json.loads(line))
+
+    @staticmethod
+    def key(entry: Dict) -> Tuple[str, str]:
+        return entry['kind'], str(entry['page'] if entry['kind'] == 'page' else entry['resume_id'])
+
+    def apply(self, entry: Dict):
+        if entry['error'] is None:
+            self.failed.pop(self.key(entry), None)
+        else:
+            self.failed[self.key(entry)] = entry
+
+    def append(self, entries: List[Dict]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write('\n')
+                self.apply(entry)
+
+    def failure(self, entry: Dict, error: str) -> Dict:
+        previous = self.failed.get(self.key(entry))
+        return {**entry, 'error': error, 'attempts': previous['attempts'] + 1 if previous else 1, 'failed_at': now()}
+
+    def fail_pages(self, pages: Iterable[int], error: str):
+        self.append([self.failure({'kind': 'page', 'page': page}, error) for page in pages])
+
+    def fail_resume(self, candidate: Dict, error: str):
+        entry = {'kind': 'resume', 'resume_id': CrawlState.resume_key(candidate), 'record': candidate}
+        self.append([self.failure(entry, error)])
+
+    def recover_page(self, page: int):
+        if ('page', str(page)) in self.failed:
+            self.append([{'kind': 'page', 'page': page, 'error': None}])
+
+    def recover_resume(self, candidate: Dict):
+        key = CrawlState.resume_key(candidate)
+        if ('resume', key) in self.failed:
+            self.append([{'kind': 'resume', 'resume_id': key, 'error': None}])
+
+    def failed_pages(self) -> List[Tuple[int, int, str]]:
+        """Dead-letter listing pages as (page, attempts, error)"""
+        return sorted((entry['page'], entry['attempts'], entry['error'])
+                      for entry in self.failed.values() if entry['kind'] == 'page')
+
+    def failed_resumes(self) -> List[Tuple[Dict, int, str]]:
+        """Dead-letter resumes as (record, attempts, error); the record holds the listing card fields"""
+        return [(dict(entry['record']), entry['attempts'], entry['error'])
+                for entry in self.failed.values() if entry['kind'] == 'resume']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a SmartJob.az crawl state database or dead-letter log')
+    parser.add_argument('state_file', nargs='?', default='scraped_data/crawl_state.db',
+                        help='State database or failed.ndjson dead-letter log (default: scraped_data/crawl_state.db)')
+    parser.add_argument('--failed', action='store_true', help='List the failed pages and resumes')
+
+    args = parser.parse_args()
+
+    if not Path(args.state_file).exists():
+        parser.error(f"{args.state_file} does not exist")
+
+    if args.state_file.endswith('.ndjson'):
+        state = DeadLetters(args.state_file, resume=True)
+        print(f"failed: pages={len(state.failed_pages())}, resumes={len(state.failed_resumes())}")
+    else:
+        state = CrawlState(args.state_file, resume=True)
+        for table, counts in state.summary().items():
+            print(f"{table}: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    
+    if args.failed or isinstance(state, DeadLetters):
+        for page, attempts, error in state.failed_pages():
+            print(f"page {page}: {error} ({attempts} attempts)")
+        for candidate, attempts, error in state.failed_resumes():
+            print(f"resume {candidate['profile_url']}: {error} ({attempts} attempts)")
+    if isinstance(state, CrawlState):
+        state.close()
+
+
+if __name__ == "__main__":
+    main()
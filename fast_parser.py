@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Fast resume page parser for SmartJob.az
+
+An lxml backend for SmartJobScraper.parse_detailed_info. Instead of building a
+BeautifulSoup tree and running a whole-document search per section, it walks
+the page once, records the document position of every element the extractor
+looks at, and answers the find/find_next lookups from that index.
+
+It reproduces the BeautifulSoup html.parser semantics the extractor relies on
+(exact .string heading matches, get_text(strip=True), class token matching),
+so both backends produce identical dicts.
+
+Usage:
+    python fast_parser.py PAGE.html [PAGE.html ...]
+        Compare both backends on saved resume pages and report differences
+"""
+
+import argparse
+import json
+import logging
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from bs4.dammit import UnicodeDammit
+from lxml import etree
+
+# Strings under these tags are not NavigableStrings in BeautifulSoup, so
+# get_text() leaves them out
+NON_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+HEADINGS = ('Mənim haqqımda', 'Dil bilikləriniz', 'Təhsil', 'İş təcrübəsi')
+
+logger = logging.getLogger(__name__)
+
+
+def parse_document(content: bytes) -> Optional[etree._Element]:
+    """Decode a page the same way BeautifulSoup does and parse it with lxml"""
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    return etree.fromstring(markup.encode('utf-8'), etree.HTMLParser(encoding='utf-8'))
+
+
+def has_class(element: etree._Element, class_name: str) -> bool:
+    """Match a class the way BeautifulSoup's class_ argument does"""
+    value = element.get('class')
+    return value is not None and (value == class_name or class_name in value.split())
+
+
+def iter_strings(element: etree._Element) -> Iterator[str]:
+    """Yield the text nodes below an element in document order"""
+    if element.text and element.tag not in NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            yield from iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def get_text(element: etree._Element) -> str:
+    """Equivalent of Tag.get_text(strip=True)"""
+    return ''.join(text.strip() for text in iter_strings(element) if text.strip())
+
+
+def get_string(element: etree._Element) -> Optional[str]:
+    """Equivalent of Tag.string"""
+    nodes = [element.text] if element.text else []
+    for child in element:
+        nodes.append(child)
+        if child.tail:
+            nodes.append(child.tail)
+
+    if len(nodes) != 1:
+        return None
+    node = nodes[0]
+    if isinstance(node, str):
+        return node
+    if isinstance(node.tag, str):
+        return get_string(node)
+    return node.text
+
+
+def find(element: etree._Element, tag: str, class_name: Optional[str] = None) -> Optional[etree._Element]:
+    """Equivalent of Tag.find(tag, class_=class_name)"""
+    for descendant in element.iterdescendants(tag):
+        if class_name is None or has_class(descendant, class_name):
+            return descendant
+    return None
+
+
+class ResumePageIndex:
+    """Document-order index of the elements the resume extractor uses"""
+
+    def __init__(self, root: Optional[etree._Element]):
+        self.elements = []
+        self.headings = {}
+        self.divs = []
+        self.details_divs = []
+        self.edu_lists = []
+        self.skills = None
+        self.info_list = None
+
+        if root is None:
+            return
+
+        for position, element in enumerate(root.iter(etree.Element)):
+            self.elements.append(element)
+            tag = element.tag
+
+            if tag == 'div':
+                self.divs.append(position)
+                if has_class(element, 'details-text'):
+                    self.details_divs.append(position)
+                if self.skills is None and has_class(element, 'browse-resume-skills'):
+                    self.skills = element
+            elif tag == 'h2':
+                heading = get_string(element)
+                if heading in HEADINGS and heading not in self.headings:
+                    self.headings[heading] = position
+            elif tag == 'ul':
+                if has_class(element, 'trim-edu-list'):
+                    self.edu_lists.append(position)
+                if self.info_list is None and has_class(element, 'ove-detail-list'):
+                    self.info_list = element
+
+    def find_next(self, heading: str, positions: List[int]) -> Optional[etree._Element]:
+        """First indexed element after a section heading, like heading.find_next()"""
+        start = self.headings.get(heading)
+        if start is None:
+            return None
+        i = bisect_right(positions, start)
+        return self.elements[positions[i]] if i < len(positions) else None
+
+
+def parse_detailed_info(candidate: Dict, content: bytes, logger: logging.Logger) -> Dict:
+    """Merge the sections of a raw resume page into the candidate"""
+    try:
+        page = ResumePageIndex(parse_document(content))
+
+        # Extract detailed description
+        about_div = page.find_next('Mənim haqqımda', page.details_divs)
+        if about_div is not None:
+            candidate['about'] = get_text(about_div)
+
+        # Extract languages
+        languages = []
+        lang_div = page.find_next('Dil bilikləriniz', page.divs)
+        if lang_div is not None:
+            for lang_item in lang_div.itersiblings('div'):
+                lang_text = get_text(lang_item)
+                if '—' in lang_text:
+                    lang_parts = lang_text.split('—')
+                    if len(lang_parts) >= 2:
+                        languages.append({
+                            'language': lang_parts[0].strip(),
+                            'level': lang_parts[1].strip()
+                        })
+        candidate['languages'] = languages
+
+        # Extract education
+        education = []
+        edu_list = page.find_next('Təhsil', page.edu_lists)
+        if edu_list is not None:
+            for edu_item in edu_list.iterdescendants('li'):
+                edu_info = {}
+
+                level_div = find(edu_item, 'div')
+                if level_div is not None:
+                    edu_info['level'] = get_text(level_div)
+
+                title_elem = find(edu_item, 'h4', 'trim-edu-title')
+                if title_elem is not None:
+                    school_link = find(title_elem, 'a')
+                    if school_link is not None:
+                        edu_info['institution'] = get_text(school_link)
+
+                    year_span = find(title_elem, 'span', 'title-est')
+                    if year_span is not None:
+                        edu_info['year'] = get_text(year_span)
+
+                strong_elem = find(edu_item, 'strong')
+                if strong_elem is not None:
+                    faculty_field = get_text(strong_elem)
+                    if '/' in faculty_field:
+                        parts = faculty_field.split('/')
+                        edu_info['faculty'] = parts[0].strip()
+                        edu_info['field'] = parts[1].strip() if len(parts) > 1 else ''
+
+                if edu_info:
+                    education.append(edu_info)
+        candidate['education'] = education
+
+        # Extract work experience
+        experience = []
+        exp_list = page.find_next('İş təcrübəsi', page.edu_lists)
+        if exp_list is not None:
+            for exp_item in exp_list.iterdescendants('li'):
+                exp_info = {}
+
+                title_elem = find(exp_item, 'h4', 'trim-edu-title')
+                if title_elem is not None:
+                    company_link = find(title_elem, 'a')
+                    if company_link is not None:
+                        exp_info['company'] = get_text(company_link)
+
+                    date_span = find(title_elem, 'span', 'title-est')
+                    if date_span is not None:
+                        exp_info['duration'] = get_text(date_span)
+
+                strong_elem = find(exp_item, 'strong')
+                if strong_elem is not None:
+                    exp_info['position'] = get_text(strong_elem)
+
+                if exp_info:
+                    experience.append(exp_info)
+        candidate['experience'] = experience
+
+        # Extract skills from sidebar
+        skills = []
+        if page.skills is not None:
+            for skill_link in page.skills.iterdescendants('a'):
+                skill_span = find(skill_link, 'span')
+                if skill_span is not None:
+                    skills.append(get_text(skill_span))
+        candidate['skills'] = skills
+
+        # Extract additional info from sidebar
+        if page.info_list is not None:
+            for info_item in page.info_list.iterdescendants('li'):
+                h5_elem = find(info_item, 'h5')
+                span_elem = find(info_item, 'span')
+
+                if h5_elem is not None and span_elem is not None:
+                    key = get_text(h5_elem)
+                    value = get_text(span_elem)
+
+                    if 'Telefon' in key:
+                        candidate['phone'] = value
+                    elif 'Yaş' in key:
+                        candidate['age'] = value
+                    elif 'İş stajı' in key:
+                        candidate['work_experience'] = value
+                    elif 'Təhsil' in key:
+                        candidate['education_level'] = value
+
+    except Exception as e:
+        logger.error(f"Error extracting detailed info from {candidate.get('profile_url')}: {e}")
+        candidate['detail_error'] = type(e).__name__
+
+    return candidate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the lxml and BeautifulSoup resume parsers')
+    parser.add_argument('pages', nargs='+', help='Saved resume HTML files')
+
+    args = parser.parse_args()
+
+    from smartjob_scraper import PageParser
+
+    # Read-only comparison: no scraper, log file or metrics, errors go to stderr
+    reference = PageParser(parser='bs4')
+    mismatches = 0
+
+    for path in args.pages:
+        content = Path(path).read_bytes()
+        expected = reference.parse_resume({'profile_url': path}, content)
+        actual = parse_detailed_info({'profile_url': path}, content, logger)
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ {path}")
+            print(f"   bs4:  {json.dumps(expected, ensure_ascii=False)}")
+            print(f"   lxml: {json.dumps(actual, ensure_ascii=False)}")
+
+    print(f"Compared {len(args.pages)} pages: {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
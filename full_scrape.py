@@ -3,20 +3,32 @@
 Full SmartJob.az scraper - scrapes all 93 pages with optimized settings
 """
 
-from smartjob_scraper import SmartJobScraper
+from smartjob_scraper import create_scraper_from_args, add_scraper_arguments
 import time
+import argparse
 from datetime import datetime
 
 def main():
+    parser = argparse.ArgumentParser(description='Full SmartJob.az Resume Scraper')
+    add_scraper_arguments(parser)
+    args = parser.parse_args()
+    
     print("🚀 Starting FULL SmartJob.az scraping...")
     print("=" * 60)
     print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("Pages to scrape: 1-93 (~9,300 candidates)")
-    print("Estimated time: 6-8 hours")
+    print(f"Engine: {args.engine}")
+    if args.resume:
+        print("Resuming: finished pages and resumes are loaded from the crawl state")
+    if args.replay:
+        print("Replaying from the response cache (no network access)")
+    else:
+        print("Estimated time: 6-8 hours" if args.engine == 'sync' else "Estimated time: depends on --rate")
     print("=" * 60)
     
     # Initialize scraper with optimized settings
-    scraper = SmartJobScraper(
+    scraper = create_scraper_from_args(
+        args,
         delay_range=(1.5, 2.5),  # Respectful but efficient delays
         output_dir="full_scrape_results"
     )
@@ -24,12 +36,16 @@ def main():
     # Process in batches for better memory management
     batch_size = 10
     all_candidates = []
+    final_filename = "smartjob_all_candidates_complete"
+    if args.stream:
+        scraper.open_stream(final_filename)
     
     for start_page in range(1, 94, batch_size):
         end_page = min(start_page + batch_size - 1, 93)
         
         print(f"\n📄 Processing batch: pages {start_page}-{end_page}")
         print(f"Time: {datetime.now().strftime('%H:%M:%S')}")
+        resumed = args.resume and scraper.state.is_complete(start_page, end_page)
         
         try:
             batch_candidates = scraper.scrape_pages(start_page, end_page)
@@ -37,32 +53,41 @@ def main():
             
             # Save batch progress
             batch_filename = f"batch_{start_page:02d}_{end_page:02d}"
-            scraper.save_data(batch_candidates, batch_filename)
+            if args.stream:
+                scraper.sink.checkpoint()
+            else:
+                scraper.save_data(batch_candidates, batch_filename)
             
             print(f"✅ Batch completed: {len(batch_candidates)} candidates")
             print(f"📊 Total progress: {len(all_candidates)} candidates")
             print(f"📈 Progress: {end_page}/93 pages ({end_page/93*100:.1f}%)")
             
-            # Save cumulative progress
-            if end_page % 20 == 0 or end_page == 93:  # Save every 20 pages or at end
+            # Save cumulative progress (the stream already holds it)
+            if not args.stream and (end_page % 20 == 0 or end_page == 93):  # Save every 20 pages or at end
                 cumulative_filename = f"progress_pages_01_{end_page:02d}"
                 scraper.save_data(all_candidates, cumulative_filename)
                 print(f"💾 Saved cumulative progress: {cumulative_filename}")
             
             # Rest between batches (except last)
-            if end_page < 93:
+            if end_page < 93 and not resumed and not args.replay:
                 rest_time = 30  # 30 seconds between batches
                 print(f"⏸️  Resting {rest_time} seconds before next batch...")
                 time.sleep(rest_time)
                 
         except Exception as e:
             print(f"❌ Error in batch {start_page}-{end_page}: {e}")
+            # The batch records are not in the output; queue its pages for retry_failed.py
+            scraper.dead_letters.fail_pages(range(start_page, end_page + 1), type(e).__name__)
+            if scraper.state:
+                scraper.state.fail_pages(range(start_page, end_page + 1), type(e).__name__)
             print("Continuing with next batch...")
             continue
     
     # Final save
-    final_filename = "smartjob_all_candidates_complete"
-    scraper.save_data(all_candidates, final_filename)
+    if args.stream:
+        scraper.close_stream(pretty_json=args.pretty_json)
+    else:
+        scraper.save_data(all_candidates, final_filename)
     
     # Summary
     end_time = datetime.now()
@@ -70,7 +95,14 @@ def main():
     print("🎉 SCRAPING COMPLETED!")
     print(f"End time: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Total candidates: {len(all_candidates)}")
-    print(f"Final files: {final_filename}.json and {final_filename}.csv")
+    if args.incremental:
+        print(f"Unchanged candidates carried forward: {scraper.carried_forward}")
+    failed_pages, failed_resumes = len(scraper.dead_letters.failed_pages()), len(scraper.dead_letters.failed_resumes())
+    if failed_pages or failed_resumes:
+        print(f"⚠️  Failed: {failed_pages} pages, {failed_resumes} resumes "
+              f"(re-fetch with: python retry_failed.py full_scrape_results/{final_filename}.{'ndjson' if args.stream else 'json'})")
+    scraper.finish_run()
+    print(f"Final files: {final_filename}.{'ndjson' if args.stream else 'json'} and {final_filename}.csv")
     print("=" * 60)
 
 if __name__ == "__main__":
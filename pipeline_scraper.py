@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline engine for SmartJob.az
+
+Splits a crawl into listing fetch -> detail fetch -> parse -> output stages
+connected by bounded queues, so a slow stage applies backpressure instead of
+letting work pile up in memory. Parsing runs in a process pool on the raw
+response bytes, which lets network waits and parse CPU overlap on multi-core
+machines. Records are re-ordered before output, so the files are identical to
+the sequential engine.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import aiohttp
+
+from async_scraper import AsyncSmartJobScraper, TokenBucket
+from records import Candidate
+from smartjob_scraper import PageParser
+
+# Parser instance owned by each pool worker process
+_worker_parser = None
+
+
+def _init_worker(base_url: str, parser: str):
+    global _worker_parser
+    _worker_parser = PageParser(parser=parser, base_url=base_url)
+
+
+def parse_listing(content: bytes) -> List[Dict]:
+    """Extract candidate cards from a raw listing page"""
+    return _worker_parser.parse_listing(content)
+
+
+def parse_resume(candidate: Dict, content: bytes) -> Dict:
+    """Merge a raw resume page into its candidate"""
+    return _worker_parser.parse_resume(candidate, content)
+
+
+def timed(func, *args):
+    """Run a worker function, returning its result and duration in the worker"""
+    started = time.perf_counter()
+    return func(*args), time.perf_counter() - started
+
+
+class PipelineSmartJobScraper(AsyncSmartJobScraper):
+    def __init__(self, parse_workers=None, queue_size=None, **kwargs):
+        super().__init__(**kwargs)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.concurrency * 2
+
+    async def listing_stage(self, session, pool, pages, detail_queue, output_queue):
+        """Fetch and parse listing pages, feeding their candidates downstream"""
+        loop = asyncio.get_running_loop()
+
+        for page in pages:
+            candidates = self.state.get_listing(page) if self.state else None
+
+            if candidates is None:
+                if self.state:
+                    self.state.start_page(page)
+
+                url = f"{self.base_url}/resumes?page={page}"
+                content = await self.fetch_async(session, url)
+                if content is not None:
+                    candidates, seconds = await loop.run_in_executor(pool, timed, parse_listing, content)
+                    self.metrics.observe('parse', seconds)
+
+                self.finish_listing(page, url, candidates)
+
+            if candidates is None:
+                await output_queue.put(('page', page, None))
+                continue
+
+            self.logger.info(f"Found {len(candidates)} candidates on page {page}")
+            await output_queue.put(('page', page, len(candidates)))
+
+            for index, candidate in enumerate(candidates):
+                finished = self.finished_resume(candidate)
+                if finished is not None:
+                    await output_queue.put(('record', page, index, finished))
+                else:
+                    await detail_queue.put((page, index, candidate))
+
+        for _ in range(self.concurrency):
+            await detail_queue.put(None)
+
+    async def detail_stage(self, session, detail_queue, parse_queue):
+        """Fetch raw resume pages"""
+        while True:
+            item = await detail_queue.get()
+            if item is None:
+                break
+
+            page, index, candidate = item
+            if self.state:
+                self.state.start_resume(candidate)
+            content = await self.fetch_async(session, candidate['profile_url'])
+            await parse_queue.put((page, index, candidate, content))
+
+    async def fetch_stage(self, session, detail_queue, parse_queue, parsers: int):
+        """Run the resume fetchers, then signal the parsers to finish"""
+        await asyncio.gather(*(self.detail_stage(session, detail_queue, parse_queue)
+                               for _ in range(self.concurrency)))
+
+        for _ in range(parsers):
+            await parse_queue.put(None)
+
+    async def parse_stage(self, pool, parse_queue, output_queue):
+        """Parse raw resume pages in the process pool"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await parse_queue.get()
+            if item is None:
+                break
+
+            page, index, candidate, content = item
+            if content is not None:
+                candidate, seconds = await loop.run_in_executor(pool, timed, parse_resume, candidate, content)
+                self.metrics.observe('parse', seconds)
+
+            candidate = self.finish_resume(candidate, content is not None)
+            await output_queue.put(('record', page, index, candidate))
+
+    async def output_stage(self, output_queue, start_page: int, end_page: int) -> List[Candidate]:
+        """Re-order parsed records by page and save progress"""
+        all_candidates = []
+        expected = {}
+        records = {}
+        next_page = start_page
+
+        while next_page <= end_page:
+            item = await output_queue.get()
+            if item[0] == 'page':
+                _, page, count = item
+                expected[page] = count
+            else:
+                _, page, index, candidate = item
+                records.setdefault(page, {})[index] = candidate
+
+            while next_page in expected:
+                count = expected[next_page]
+                done = records.get(next_page, {})
+                if count is not None and len(done) < count:
+                    break
+
+                if count is not None:
+                    self.logger.info(f"Scraped page {next_page}/{end_page}")
+                    page_candidates = [done[index] for index in range(count)]
+                    self.collect_page(all_candidates, page_candidates, start_page, next_page)
+
+                del expected[next_page]
+                records.pop(next_page, None)
+                next_page += 1
+
+        return all_candidates
+
+    async def scrape_pages_async(self, start_page: int = 1, end_page: int = 93) -> List[Candidate]:
+        """Scrape multiple pages of candidates through the staged pipeline"""
+        self.bucket = TokenBucket(self.current_rate())
+        detail_queue = asyncio.Queue(self.queue_size)
+        parse_queue = asyncio.Queue(self.queue_size)
+        output_queue = asyncio.Queue(self.queue_size)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=10)
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_worker,
+                                 initargs=(self.base_url, self.parser)) as pool:
+            async with aiohttp.ClientSession(headers=dict(self.session.headers),
+                                             connector=connector, timeout=timeout) as session:
+                stages = [
+                    self.listing_stage(session, pool, range(start_page, end_page + 1), detail_queue, output_queue),
+                    self.fetch_stage(session, detail_queue, parse_queue, self.parse_workers),
+                ]
+                stages += [self.parse_stage(pool, parse_queue, output_queue) for _ in range(self.parse_workers)]
+                results = await asyncio.gather(self.output_stage(output_queue, start_page, end_page), *stages)
+
+        return results[0]
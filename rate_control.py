@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Adaptive request pacing for SmartJob.az
+
+AdaptiveThrottle adjusts the request rate to what the server tolerates
+(AIMD): while responses come back healthy the rate grows additively, and on
+429/5xx responses, timeouts or response latency rising well above its
+baseline the rate is cut multiplicatively. Retries wait with exponential
+backoff and jitter, and never less than the server's Retry-After.
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Responses that mean the server is overloaded or asking us to slow down
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Longest Retry-After honored, in seconds
+MAX_RETRY_AFTER = 600
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        delay = parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+    return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with jitter for a retry, honoring Retry-After"""
+    delay = min(cap, base * 2 ** attempt)
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class AdaptiveThrottle:
+    # Requests/second gained per second of healthy responses
+    INCREASE = 0.5
+    # Rate multipliers on an error response and on a latency spike
+    ERROR_DECREASE = 0.5
+    LATENCY_DECREASE = 0.8
+    # Latency above this multiple of the baseline, and at least LATENCY_SLACK
+    # seconds over it, counts as congestion
+    LATENCY_FACTOR = 2.0
+    LATENCY_SLACK = 0.25
+    # Weight of the newest sample in the latency and error averages (the error average is only reported)
+    SMOOTHING = 0.2
+
+    def __init__(self, rate: float, min_rate: Optional[float] = None, max_rate: Optional[float] = None):
+        self.rate = rate
+        self.min_rate = min_rate or rate / 10
+        self.max_rate = max_rate or rate * 10
+        self.latency = None
+        self.baseline = None
+        self.error_rate = 0.0
+        self.decreased_at = 0.0
+        self.next_at = 0.0
+
+    def wait(self):
+        """Block until the next request may be sent (sequential engine)"""
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + 1 / self.rate
+
+    def hold(self, seconds: float):
+        """Send nothing for the given time"""
+        self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+    def on_success(self, latency: float):
+        """Record a healthy response and its latency"""
+        self.error_rate *= 1 - self.SMOOTHING
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.SMOOTHING * (latency - self.latency)
+        # Lowest latency seen, drifting up slowly so a lasting change becomes the new normal
+        self.baseline = self.latency if self.baseline is None else min(self.baseline * 1.01, self.latency)
+
+        if self.latency > max(self.baseline * self.LATENCY_FACTOR, self.baseline + self.LATENCY_SLACK):
+            self.decrease(self.LATENCY_DECREASE)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.INCREASE / self.rate)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Record a 429/5xx response"""
+        self.on_error()
+        if retry_after:
+            self.hold(retry_after)
+
+    def on_error(self):
+        """Record a failed request (error status, timeout or connection error)"""
+        self.error_rate += self.SMOOTHING * (1 - self.error_rate)
+        self.decrease(self.ERROR_DECREASE)
+
+    def decrease(self, factor: float):
+        # Cut at most once per round trip, so one burst of errors is one signal
+        now = time.monotonic()
+        if now - self.decreased_at < max(1 / self.rate, self.latency or 0):
+            return
+        self.decreased_at = now
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def gauges(self) -> Dict[str, float]:
+        """Current rate and the signals it follows, for the run metrics"""
+        return {
+            'request_rate': self.rate,
+            'latency_seconds': self.latency or 0.0,
+            'baseline_latency_seconds': self.baseline or 0.0,
+            'error_rate': self.error_rate,
+        }
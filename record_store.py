@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Append-only record store for SmartJob.az output with random access by resume
+
+A store is two files. NAME.records is a log of length-prefixed JSON records
+(a little-endian uint32 length, then the UTF-8 JSON). NAME.idx is a sorted
+table of (64-bit hash of the resume key, record offset) pairs. Both are read
+through mmap: a lookup is a binary search in the index and one json.loads of
+the record it points to, so neither file is loaded or parsed as a whole.
+
+Appending a record for a resume that is already stored adds a new version
+and points the index at it; compact() drops the superseded versions.
+
+Usage:
+    python record_store.py import FILE.json [FILE.ndjson ...] --store scraped_data/candidates.records
+    python record_store.py get scraped_data/candidates.records RESUME_ID [RESUME_ID ...]
+    python record_store.py export scraped_data/candidates.records --format json|ndjson|csv [--output FILE]
+    python record_store.py info scraped_data/candidates.records
+    python record_store.py compact scraped_data/candidates.records
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from crawl_state import CrawlState
+from streaming_writer import csv_row, ordered_fieldnames, write_json_array
+
+LOG_MAGIC = b'SJREC1\n\0'
+INDEX_MAGIC = b'SJIDX1\n\0'
+LENGTH = struct.Struct('<I')
+ENTRY = struct.Struct('<QQ')
+COUNT = struct.Struct('<Q')
+INDEX_HEADER = len(INDEX_MAGIC) + COUNT.size
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def encode(record: Dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class RecordStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.index_path = self.path.with_suffix('.idx')
+        self._log = None
+        self._index = None
+        self._files = []
+
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(LOG_MAGIC)
+            self._write_index({})
+        elif not self.index_path.exists():
+            self.rebuild_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the memory maps"""
+        for view in (self._log, self._index):
+            if view is not None:
+                view.close()
+        for f in self._files:
+            f.close()
+        self._log = self._index = None
+        self._files = []
+
+    def _map(self):
+        if self._log is None:
+            for path in (self.path, self.index_path):
+                f = open(path, 'rb')
+                self._files.append(f)
+            self._log = mmap.mmap(self._files[0].fileno(), 0, access=mmap.ACCESS_READ)
+            self._index = mmap.mmap(self._files[1].fileno(), 0, access=mmap.ACCESS_READ)
+            if self._log[:len(LOG_MAGIC)] != LOG_MAGIC or self._index[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                self.close()
+                raise ValueError(f"Not a record store: {self.path}")
+
+    def __len__(self):
+        self._map()
+        return COUNT.unpack_from(self._index, len(INDEX_MAGIC))[0]
+
+    def _entry(self, position: int):
+        return ENTRY.unpack_from(self._index, INDEX_HEADER + position * ENTRY.size)
+
+    def _find(self, key: str) -> Optional[int]:
+        """Offset of the latest record of a resume, by binary search in the index"""
+        self._map()
+        target = key_hash(key)
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self):
+            found, offset = self._entry(low)
+            if found == target:
+                return offset
+        return None
+
+    def _read(self, offset: int) -> bytes:
+        length = LENGTH.unpack_from(self._log, offset)[0]
+        start = offset + LENGTH.size
+        return self._log[start:start + length]
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """JSON bytes of the latest record of a resume, without decoding it"""
+        offset = self._find(key)
+        return None if offset is None else self._read(offset)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Latest record of a resume_id (or profile_url for records without one)"""
+        raw = self.get_raw(key)
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        # Guard against the (unlikely) collision of two keys' hashes
+        return record if CrawlState.resume_key(record) == key else None
+
+    def __contains__(self, key: str):
+        return self.get(key) is not None
+
+    def offsets(self) -> List[int]:
+        """Offsets of the latest version of every record, in log order"""
+        self._map()
+        return sorted(self._entry(position)[1] for position in range(len(self)))
+
+    def records(self, keys: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Latest version of every record in log order, or the records of the given keys in key order"""
+        if keys is None:
+            for offset in self.offsets():
+                yield json.loads(self._read(offset))
+            return
+        for key in keys:
+            record = self.get(key)
+            if record is not None:
+                yield record
+
+    def __iter__(self):
+        return self.records()
+
+    def _scan(self, start: int = len(LOG_MAGIC)) -> Iterator[tuple]:
+        """(offset, length) of every complete record from start on, superseded versions included"""
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
+                offset = start
+                while offset + LENGTH.size <= len(log):
+                    length = LENGTH.unpack_from(log, offset)[0]
+                    if offset + LENGTH.size + length > len(log):
+                        # Torn write at the tail of an interrupted append
+                        break
+                    yield offset, length
+                    offset += LENGTH.size + length
+
+    def _recover(self, entries: Dict[int, int]) -> int:
+        """Index records appended after the last index write and return the end of the last complete record"""
+        self._map()
+        end = len(LOG_MAGIC)
+        if entries:
+            last = max(entries.values())
+            end = last + LENGTH.size + LENGTH.unpack_from(self._log, last)[0]
+        for offset, length in self._scan(end):
+            entries[key_hash(CrawlState.resume_key(json.loads(self._read(offset))))] = offset
+            end = offset + LENGTH.size + length
+        return end
+
+    def _index_entries(self) -> Dict[int, int]:
+        self._map()
+        return dict(self._entry(position) for position in range(len(self)))
+
+    def _write_index(self, entries: Dict[int, int]):
+        """Write the sorted index next to the log and swap it in atomically"""
+        self.close()
+        tmp_path = self.index_path.with_suffix('.idx.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(COUNT.pack(len(entries)))
+            for hashed in sorted(entries):
+                f.write(ENTRY.pack(hashed, entries[hashed]))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.index_path)
+
+    def append(self, records: Iterable[Dict]) -> int:
+        """Append records and point the index at them; returns the number appended"""
+        entries = self._index_entries()
+        end = self._recover(entries)
+        self.close()
+
+        count = 0
+        with open(self.path, 'r+b') as f:
+            # Drop a torn record left by an interrupted append
+            f.truncate(end)
+            f.seek(end)
+            for record in records:
+                payload = encode(record)
+                entries[key_hash(CrawlState.resume_key(record))] = f.tell()
+                f.write(LENGTH.pack(len(payload)))
+                f.write(payload)
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._write_index(entries)
+        return count
+
+    def rebuild_index(self) -> int:
+        """Recreate the index from the log"""
+        entries = {}
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
+                for offset, length in self._scan():
+                    start = offset + LENGTH.size
+                    entries[key_hash(CrawlState.resume_key(json.loads(log[start:start + length])))] = offset
+        self._write_index(entries)
+        return len(entries)
+
+    def compact(self) -> int:
+        """Rewrite the log with only the latest version of each record"""
+        tmp_path = self.path.with_suffix('.records.tmp')
+        tmp_path.unlink(missing_ok=True)
+        compacted = RecordStore(tmp_path)
+        count = compacted.append(self.records())
+        compacted.close()
+        self.close()
+        tmp_path.replace(self.path)
+        compacted.index_path.replace(self.index_path)
+        return count
+
+    def size(self) -> int:
+        return self.path.stat().st_size + self.index_path.stat().st_size
+
+
+def write_store(path, records: Iterable[Dict]) -> RecordStore:
+    """Create a store holding the given records, replacing any store at path"""
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    path.with_suffix('.idx').unlink(missing_ok=True)
+    store = RecordStore(path)
+    store.append(records)
+    return store
+
+
+def export_json(store: RecordStore, path):
+    """Write the store as save_data's pretty JSON array"""
+    with open(path, 'w', encoding='utf-8') as f:
+        return write_json_array(store.records(), f)
+
+
+def export_ndjson(store: RecordStore, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        count = 0
+        for record in store.records():
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def export_csv(store: RecordStore, path, priority_fields: List[str]):
+    """Write the store as save_data's CSV; the header needs one pass over the records first"""
+    fieldnames = set()
+    for record in store.records():
+        fieldnames.update(record.keys())
+
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fieldnames:
+            writer = csv.DictWriter(f, fieldnames=ordered_fieldnames(fieldnames, priority_fields))
+            writer.writeheader()
+            for record in store.records():
+                writer.writerow(csv_row(record))
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Append-only SmartJob.az record store with lookup by resume')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help='Append scraper output files to a store')
+    importer.add_argument('files', nargs='+', help='JSON, NDJSON or CSV scraper output')
+    importer.add_argument('--store', required=True, help='Store log file (NAME.records)')
+
+    getter = commands.add_parser('get', help='Print the records of resume ids')
+    getter.add_argument('store', help='Store log file')
+    getter.add_argument('keys', nargs='+', help='resume_id values (profile_url for records without one)')
+
+    exporter = commands.add_parser('export', help='Export a store as JSON, NDJSON or CSV')
+    exporter.add_argument('store', help='Store log file')
+    exporter.add_argument('--format', choices=['json', 'ndjson', 'csv'], default='json', help='Output format (default: json)')
+    exporter.add_argument('--output', default=None, help='Output file (default: next to the store)')
+
+    for name, help_text in (('info', 'Show store statistics'), ('compact', 'Drop superseded record versions')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('store', help='Store log file')
+
+    args = parser.parse_args()
+
+    if args.command != 'import' and not Path(args.store).exists():
+        parser.error(f"Store not found: {args.store}")
+
+    if args.command == 'import':
+        from consolidate import iter_records
+
+        with RecordStore(args.store) as store:
+            for path in args.files:
+                count = store.append(iter_records(Path(path)))
+                print(f"✅ {path}: {count} records appended")
+            print(f"{len(store)} resumes in {args.store}")
+
+    elif args.command == 'get':
+        with RecordStore(args.store) as store:
+            for key in args.keys:
+                record = store.get(key)
+                if record is None:
+                    print(f"Not found: {key}", file=sys.stderr)
+                else:
+                    print(json.dumps(record, ensure_ascii=False, indent=2))
+
+    elif args.command == 'export':
+        from smartjob_scraper import SmartJobScraper
+
+        output = args.output or str(Path(args.store).with_suffix(f'.{args.format}'))
+        with RecordStore(args.store) as store:
+            if args.format == 'json':
+                count = export_json(store, output)
+            elif args.format == 'ndjson':
+                count = export_ndjson(store, output)
+            else:
+                count = export_csv(store, output, SmartJobScraper.PRIORITY_FIELDS)
+        print(f"✅ Exported {count} records to {output}")
+
+    elif args.command == 'info':
+        with RecordStore(args.store) as store:
+            versions = sum(1 for _ in store._scan())
+            print(f"Resumes: {len(store)}")
+            print(f"Record versions in log: {versions} ({versions - len(store)} superseded)")
+            print(f"Size: {store.size() / 1024 / 1024:.2f} MB")
+
+    elif args.command == 'compact':
+        with RecordStore(args.store) as store:
+            count = store.compact()
+        print(f"✅ Compacted {args.store} to {count} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory records for scraped SmartJob.az candidates
+
+The extractors build plain dicts, which cost about a kilobyte each before
+counting their strings, and repeat values like 'Ali təhsil', 'Azərbaycan' or
+'C2' thousands of times. Candidate, Education, Experience, Language and
+SocialLink keep the same data in __slots__ dataclasses, store nested lists as
+tuples and intern low-cardinality strings, so every copy of a category or
+language level is one shared object.
+
+Records convert losslessly to and from the scraper's dict shape: keys that
+were absent stay absent, keys keep their order (the tuple of present keys is
+shared between records with the same layout), and unknown keys are kept as
+they are. They are read-only mappings, so code that reads dicts works on them
+unchanged; use to_dict before serializing.
+
+Usage:
+    python records.py FILE.json
+        Compare the memory of a JSON output file as dicts and as records
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Dict, FrozenSet, Optional, Tuple
+
+# Shared key layouts, one tuple per distinct order of present keys
+_layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(Mapping):
+    """Read-only mapping over the dataclass fields of a record"""
+
+    __slots__ = ('_keys', '_extra')
+
+    FIELDS: ClassVar[Tuple[str, ...]] = ()
+    FIELD_SET: ClassVar[FrozenSet[str]] = frozenset()
+    INTERNED: ClassVar[FrozenSet[str]] = frozenset()
+    # List fields whose dict items become records of the given type
+    NESTED: ClassVar[Dict[str, type]] = {}
+    # List fields of plain strings
+    STRING_LISTS: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __post_init__(self):
+        self._keys = _layout(tuple(name for name in self.FIELDS if getattr(self, name) is not None))
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Record holding the same keys, values and key order as data"""
+        values = {}
+        extra = {}
+        for key, value in data.items():
+            if key not in cls.FIELD_SET:
+                extra[key] = value
+            elif key in cls.NESTED and type(value) is list:
+                record_type = cls.NESTED[key]
+                values[key] = tuple(record_type.from_dict(item) if type(item) is dict else item for item in value)
+            elif key in cls.STRING_LISTS and type(value) is list:
+                values[key] = tuple(intern(item) for item in value)
+            else:
+                values[key] = intern(value) if key in cls.INTERNED else value
+
+        record = cls(**values)
+        record._keys = _layout(tuple(data))
+        record._extra = extra or None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record in the scraper's dict shape"""
+        return {key: _plain(self[key]) for key in self._keys}
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in self.FIELD_SET:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def _layout(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _layouts.setdefault(keys, keys)
+
+
+def record(cls):
+    """Turn a Record subclass into a slotted dataclass"""
+    cls = dataclass(slots=True, eq=False, repr=False)(cls)
+    cls.FIELDS = tuple(field.name for field in fields(cls))
+    cls.FIELD_SET = frozenset(cls.FIELDS)
+    return cls
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if type(value) is tuple:
+        return [_plain(item) for item in value]
+    return value
+
+
+@record
+class SocialLink(Record):
+    platform: Optional[str] = None
+    url: Optional[str] = None
+
+    INTERNED: ClassVar[FrozenSet[str]] = frozenset({'platform'})
+
+
+@record
+class Language(Record):
+    language: Optional[str] = None
+    level: Optional[str] = None
+
+    INTERNED: ClassVar[FrozenSet[str]] = frozenset({'language', 'level'})
+
+
+@record
+class Education(Record):
+    level: Optional[str] = None
+    institution: Optional[str] = None
+    year: Optional[str] = None
+    faculty: Optional[str] = None
+    field: Optional[str] = None
+
+    INTERNED: ClassVar[FrozenSet[str]] = frozenset({'level', 'institution', 'year', 'faculty', 'field'})
+
+
+@record
+class Experience(Record):
+    company: Optional[str] = None
+    duration: Optional[str] = None
+    position: Optional[str] = None
+
+    INTERNED: ClassVar[FrozenSet[str]] = frozenset({'company', 'duration', 'position'})
+
+
+@record
+class Candidate(Record):
+    name: Optional[str] = None
+    profile_url: Optional[str] = None
+    resume_id: Optional[str] = None
+    job_category: Optional[str] = None
+    category_name: Optional[str] = None
+    last_updated: Optional[str] = None
+    salary: Optional[str] = None
+    social_links: Optional[Tuple[SocialLink, ...]] = None
+    about: Optional[str] = None
+    languages: Optional[Tuple[Language, ...]] = None
+    education: Optional[Tuple[Education, ...]] = None
+    experience: Optional[Tuple[Experience, ...]] = None
+    skills: Optional[Tuple[str, ...]] = None
+    phone: Optional[str] = None
+    age: Optional[str] = None
+    work_experience: Optional[str] = None
+    education_level: Optional[str] = None
+
+    INTERNED: ClassVar[FrozenSet[str]] = frozenset({
+        'job_category', 'category_name', 'last_updated', 'salary', 'age', 'work_experience', 'education_level'
+    })
+    NESTED: ClassVar[Dict[str, type]] = {
+        'social_links': SocialLink, 'languages': Language, 'education': Education, 'experience': Experience
+    }
+    STRING_LISTS: ClassVar[FrozenSet[str]] = frozenset({'skills'})
+
+    def __repr__(self):
+        return f"Candidate({self.get('resume_id') or self.get('profile_url')!r}, {self.get('name')!r})"
+
+
+def as_record(candidate) -> Candidate:
+    """Candidate record of a scraped dict; records are returned as they are"""
+    return candidate if isinstance(candidate, Candidate) else Candidate.from_dict(candidate)
+
+
+def as_dict(candidate) -> Dict[str, Any]:
+    """Dict shape of a candidate record; dicts are returned as they are"""
+    return candidate.to_dict() if isinstance(candidate, Record) else candidate
+
+
+def deep_size(obj, seen=None) -> int:
+    """Bytes held by an object and everything it references, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif isinstance(obj, Record):
+        size += deep_size(obj._keys, seen) + deep_size(obj._extra, seen)
+        size += sum(deep_size(getattr(obj, name), seen) for name in obj.FIELDS)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the memory of SmartJob.az records as dicts and as Candidate records')
+    parser.add_argument('file', help='JSON output file of the scraper')
+    args = parser.parse_args()
+
+    with open(args.file, encoding='utf-8') as f:
+        dicts = json.load(f)
+    records = [Candidate.from_dict(candidate) for candidate in dicts]
+
+    if [record.to_dict() for record in records] != dicts:
+        print("❌ Round trip through Candidate records changed the data")
+        sys.exit(1)
+
+    dict_bytes = deep_size(dicts)
+    # Interned strings and key layouts are shared with the rest of the process, count them once
+    record_bytes = deep_size(records)
+    count = max(len(dicts), 1)
+    print(f"Records: {len(dicts)}")
+    print(f"As dicts:   {dict_bytes / 1024 / 1024:8.2f} MB ({dict_bytes / count:,.0f} bytes/candidate)")
+    print(f"As records: {record_bytes / 1024 / 1024:8.2f} MB ({record_bytes / count:,.0f} bytes/candidate)")
+    print(f"✅ Round trip is lossless, {dict_bytes / max(record_bytes, 1):.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
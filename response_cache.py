@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Raw HTML response cache for SmartJob.az
+
+Keeps the body of every fetched page on disk so extraction can be re-run
+without crawling again. Bodies are stored zlib-compressed under their SHA-256
+digest, so identical pages share one object. A SQLite index maps each URL to
+its digest together with the ETag/Last-Modified validators used for
+conditional requests, and evicts the least recently used entries once the
+cache grows past its size cap.
+
+Usage:
+    python response_cache.py [CACHE_DIR]
+        Print a summary of a cache directory
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+"""
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators to send with a conditional request"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, cache_dir, max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.conn = sqlite3.connect(str(self.cache_dir / 'index.db'))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+        # Running compressed size of all objects, kept up to date by put and the deletes
+        self.total = self.total_bytes()
+
+    def close(self):
+        self.conn.close()
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.z"
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Cached response for a URL, marking it as recently used"""
+        row = self.conn.execute(
+            'SELECT digest, etag, last_modified, size FROM entries WHERE url = ?', (url,)
+        ).fetchone()
+        if not row:
+            return None
+
+        digest, etag, last_modified, size = row
+        try:
+            body = zlib.decompress(self.object_path(digest).read_bytes())
+        except (OSError, zlib.error):
+            # Object lost or corrupted - forget the entry and fetch again
+            with self.conn:
+                self.conn.execute('DELETE FROM entries WHERE url = ?', (url,))
+            self.remove_unreferenced(digest, size)
+            return None
+
+        with self.conn:
+            self.conn.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (time.time(), url))
+        return CachedResponse(body, etag, last_modified)
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a response body and its validators"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(zlib.compress(body, 6))
+            tmp_path.replace(path)
+
+        previous = self.conn.execute('SELECT digest, size FROM entries WHERE url = ?', (url,)).fetchone()
+        shared = self.conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone()
+        size = path.stat().st_size
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO entries (url, digest, size, etag, last_modified, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, digest, size, etag, last_modified, now, now)
+            )
+        if not shared:
+            self.total += size
+
+        if previous and previous[0] != digest:
+            self.remove_unreferenced(*previous)
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def total_bytes(self) -> int:
+        """Compressed size of all stored objects"""
+        row = self.conn.execute('SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM entries)').fetchone()
+        return row[0] or 0
+
+    def remove_unreferenced(self, digest: str, size: int) -> bool:
+        """Delete an object of the given compressed size once no URL points at it"""
+        if self.conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+            return False
+        self.object_path(digest).unlink(missing_ok=True)
+        self.total -= size
+        return True
+
+    def evict(self, batch: int = 64):
+        """Drop least recently used entries until the cache fits its size cap"""
+        while self.total > self.max_bytes:
+            rows = self.conn.execute(
+                'SELECT url, digest, size FROM entries ORDER BY accessed_at LIMIT ?', (batch,)
+            ).fetchall()
+            if not rows:
+                break
+            for url, digest, size in rows:
+                with self.conn:
+                    self.conn.execute('DELETE FROM entries WHERE url = ?', (url,))
+                self.remove_unreferenced(digest, size)
+                if self.total <= self.max_bytes:
+                    break
+
+    def summary(self) -> Dict[str, int]:
+        entries, objects = self.conn.execute('SELECT COUNT(*), COUNT(DISTINCT digest) FROM entries').fetchone()
+        return {'entries': entries, 'objects': objects, 'bytes': self.total_bytes()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a SmartJob.az response cache')
+    parser.add_argument('cache_dir', nargs='?', default='scraped_data/http_cache',
+                        help='Cache directory (default: scraped_data/http_cache)')
+
+    args = parser.parse_args()
+
+    if not Path(args.cache_dir).exists():
+        parser.error(f"{args.cache_dir} does not exist")
+
+    cache = ResponseCache(args.cache_dir)
+    summary = cache.summary()
+    print(f"Entries: {summary['entries']}")
+    print(f"Distinct bodies: {summary['objects']}")
+    print(f"Size on disk: {summary['bytes'] / 1024 / 1024:.1f} MB")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
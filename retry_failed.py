@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Re-fetch the failed pages and resumes of a SmartJob.az crawl
+
+Every listing page and resume that could not be fetched is written to the
+dead-letter log OUTPUT_DIR/failed.ndjson with the class of its last error,
+and to the crawl state database when one is kept (--resume or --state-file).
+Records whose resume failed are saved as listing cards marked with a
+detail_error field. This command re-fetches exactly those URLs and merges the
+results into the existing output: recovered resumes replace their card
+records, and the candidates of recovered pages are inserted at their listing
+position when a crawl state recorded it, else appended. Whatever fails again
+stays queued for the next retry.
+
+Usage:
+    python retry_failed.py full_scrape_results/smartjob_all_candidates_complete.json
+    python retry_failed.py scraped_data/smartjob_candidates_pages_1-5.json [--state-file FILE]
+    python crawl_state.py full_scrape_results/failed.ndjson
+        List the queued failures without fetching anything
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from columnar_export import load_records
+from crawl_state import CrawlState
+from smartjob_scraper import SmartJobScraper, add_scraper_arguments, create_scraper_from_args
+
+
+def dead_letters(sources: List, records: List[Dict]) -> Tuple[List[Tuple[int, int, str]], List[Tuple[Dict, int, str]]]:
+    """Failed pages and resumes of the dead-letter log and crawl state, plus output records marked with detail_error
+
+    The first source that lists a page or resume wins. The marked records cover
+    outputs written before the dead-letter log existed.
+    """
+    pages = {}
+    resumes = {}
+    for source in sources:
+        for page, attempts, error in source.failed_pages():
+            pages.setdefault(page, (page, attempts, error))
+        for candidate, attempts, error in source.failed_resumes():
+            resumes.setdefault(CrawlState.resume_key(candidate), (candidate, attempts, error))
+    for record in records:
+        if 'detail_error' in record:
+            resumes.setdefault(CrawlState.resume_key(record), (dict(record), 1, record['detail_error']))
+    return sorted(pages.values()), list(resumes.values())
+
+
+def retry(scraper: SmartJobScraper, failed_pages: List[Tuple[int, int, str]],
+          failed_resumes: List[Tuple[Dict, int, str]]) -> List[Dict]:
+    """Re-fetch the failed listing pages with their resumes, then the other failed resumes"""
+    logger = scraper.logger
+    recovered = []
+
+    for page, attempts, error in failed_pages:
+        logger.info(f"Retrying page {page} ({error}, {attempts} attempts)")
+        candidates = scraper.get_listing(page)
+        scraper.pause()
+        if candidates is None:
+            continue
+
+        logger.info(f"Found {len(candidates)} candidates on page {page}")
+        for candidate in candidates:
+            finished = scraper.finished_resume(candidate)
+            if finished is None:
+                finished = scraper.extract_detailed_info(candidate)
+                scraper.pause()
+            recovered.append(finished)
+
+    retried = {CrawlState.resume_key(candidate) for candidate in recovered}
+    for candidate, attempts, error in failed_resumes:
+        if CrawlState.resume_key(candidate) in retried:
+            continue
+        logger.info(f"Retrying resume {candidate['profile_url']} ({error}, {attempts} attempts)")
+        candidate.pop('detail_error', None)
+        recovered.append(scraper.extract_detailed_info(candidate))
+        scraper.pause()
+
+    return recovered
+
+
+def merge_records(records: List[Dict], recovered: List[Dict], positions: Dict[str, Tuple[int, int]]) -> List[Dict]:
+    """Replace records by resume, add new ones, and restore listing order
+
+    Records at an unknown position keep their place after the record before them.
+    """
+    merged = list(records)
+    index = {CrawlState.resume_key(record): i for i, record in enumerate(merged)}
+    for record in recovered:
+        key = CrawlState.resume_key(record)
+        if key in index:
+            merged[index[key]] = record
+        else:
+            index[key] = len(merged)
+            merged.append(record)
+
+    order = []
+    position = (0, 0)
+    for record in merged:
+        position = positions.get(CrawlState.resume_key(record), position)
+        order.append(position)
+    return [merged[i] for i in sorted(range(len(merged)), key=order.__getitem__)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-fetch the failed pages and resumes of a SmartJob.az crawl')
+    parser.add_argument('output', help='JSON or NDJSON output of the crawl to merge the results into')
+    parser.add_argument('--delay', type=float, nargs=2, default=[1, 3], help='Delay range between requests (default: 1 3)')
+    parser.add_argument('--base-url', default='https://smartjob.az', help='Site to crawl (default: https://smartjob.az)')
+    add_scraper_arguments(parser)
+
+    args = parser.parse_args()
+    output = Path(args.output)
+    if output.suffix not in ('.json', '.ndjson') or not output.exists():
+        parser.error(f"{args.output} is not an existing .json or .ndjson output file")
+    if args.engine != 'sync':
+        parser.error("retries fetch one URL at a time; use --engine sync")
+
+    # The dead letters and a recorded crawl state are read, so neither may be reset;
+    # a crawl state is only used when the run kept one
+    args.resume = True
+    state_file = Path(args.state_file or output.parent / 'crawl_state.db')
+    scraper = create_scraper_from_args(args, delay_range=tuple(args.delay), output_dir=str(output.parent),
+                                       base_url=args.base_url, state_file=state_file if state_file.exists() else None)
+    state = scraper.state
+    records = load_records(output)
+
+    sources = [scraper.dead_letters] + ([state] if state else [])
+    failed_pages, failed_resumes = dead_letters(sources, records)
+    print(f"🔁 Retrying {len(failed_pages)} failed pages and {len(failed_resumes)} failed resumes "
+          f"from {', '.join(str(source.path) for source in sources)} and {output.name}")
+    if not failed_pages and not failed_resumes:
+        print("✅ Nothing to retry")
+        return
+
+    recovered = retry(scraper, failed_pages, failed_resumes)
+    records = merge_records(records, recovered, state.listing_positions() if state else {})
+
+    if output.suffix == '.ndjson':
+        scraper.open_stream(output.stem)
+        for record in records:
+            scraper.sink.write(record)
+        scraper.close_stream(pretty_json=output.with_suffix('.json').exists())
+    else:
+        scraper.save_data(records, output.stem)
+
+    partial = sum(1 for record in records if 'detail_error' in record)
+    print(f"\n✅ Merged {len(recovered)} re-fetched records into {output} ({len(records)} candidates)")
+    print(f"Still failed: {len(scraper.dead_letters.failed_pages())} pages; {partial} records without resume details")
+    scraper.finish_run()
+
+
+if __name__ == "__main__":
+    main()
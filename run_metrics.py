@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Run metrics for SmartJob.az
+
+Records latency histograms for the fetch, parse and save stages together with
+request, byte, retry, failure and record counters, and periodically exports
+them to OUTPUT_DIR/run_metrics.json and, in Prometheus text format, to
+OUTPUT_DIR/run_metrics.prom (suitable for the node_exporter textfile
+collector). Both files are replaced atomically.
+
+Usage:
+    python run_metrics.py [METRICS_FILE]
+        Print a summary of a run_metrics.json file
+"""
+
+import argparse
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+STAGES = ('fetch', 'parse', 'save')
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+COUNTERS = {
+    'requests': 'HTTP requests sent',
+    'bytes': 'Response body bytes downloaded',
+    'not_modified': 'Conditional requests answered with 304',
+    'retries': 'Requests that were retries of a failed attempt',
+    'failures': 'URLs given up on after all retries',
+    'records': 'Candidate records collected',
+}
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p90': round(self.quantile(0.9), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'max': round(self.max, 6),
+        }
+
+
+class RunMetrics:
+    def __init__(self, output_dir, interval: Optional[float] = 30, keep_samples: bool = False):
+        self.json_file = Path(output_dir) / 'run_metrics.json'
+        self.prom_file = Path(output_dir) / 'run_metrics.prom'
+        # Seconds between exports; 0 exports only on write(), None never exports
+        self.interval = interval
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.started = time.monotonic()
+        self.written = self.started
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.gauges = {}
+        # Raw observations per stage, for exact percentiles in benchmarks
+        self.samples = {stage: [] for stage in STAGES} if keep_samples else None
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time a block as one observation of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage: str, seconds: float):
+        self.histograms[stage].observe(seconds)
+        if self.samples is not None:
+            self.samples[stage].append(seconds)
+        self.maybe_write()
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def snapshot(self) -> Dict:
+        elapsed = self.elapsed()
+        return {
+            'started_at': self.started_at,
+            'elapsed_seconds': round(elapsed, 3),
+            **self.counters,
+            'requests_per_second': round(self.counters['requests'] / elapsed, 3) if elapsed else 0.0,
+            'records_per_second': round(self.counters['records'] / elapsed, 3) if elapsed else 0.0,
+            'stages': {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+            'gauges': dict(self.gauges),
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in Prometheus text exposition format"""
+        lines = [
+            '# HELP smartjob_stage_seconds Time spent per fetch, parse and save operation',
+            '# TYPE smartjob_stage_seconds histogram',
+        ]
+        for stage, histogram in self.histograms.items():
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f'smartjob_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'smartjob_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'smartjob_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+        for name, description in COUNTERS.items():
+            lines.append(f'# HELP smartjob_{name}_total {description}')
+            lines.append(f'# TYPE smartjob_{name}_total counter')
+            lines.append(f'smartjob_{name}_total {self.counters[name]}')
+
+        gauges = {'elapsed_seconds': self.elapsed(), **self.gauges}
+        for name, value in gauges.items():
+            lines.append(f'# TYPE smartjob_{name} gauge')
+            lines.append(f'smartjob_{name} {value:.6g}')
+        return '\n'.join(lines) + '\n'
+
+    def maybe_write(self):
+        """Export the metrics if the export interval has passed"""
+        if self.interval and time.monotonic() - self.written >= self.interval:
+            self.write()
+
+    def write(self):
+        """Export the metrics to the JSON and Prometheus files"""
+        if self.interval is None:
+            return
+        self.written = time.monotonic()
+        for path, text in ((self.json_file, json.dumps(self.snapshot(), indent=2)),
+                           (self.prom_file, self.prometheus())):
+            tmp_path = path.with_suffix(path.suffix + '.tmp')
+            tmp_path.write_text(text, encoding='utf-8')
+            tmp_path.replace(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize SmartJob.az run metrics')
+    parser.add_argument('metrics_file', nargs='?', default='scraped_data/run_metrics.json',
+                        help='Metrics file (default: scraped_data/run_metrics.json)')
+
+    args = parser.parse_args()
+
+    if not Path(args.metrics_file).exists():
+        parser.error(f"{args.metrics_file} does not exist")
+
+    with open(args.metrics_file, encoding='utf-8') as f:
+        metrics = json.load(f)
+
+    print(f"Run started {metrics['started_at']}, {metrics['elapsed_seconds']:.0f}s elapsed")
+    print(f"Requests: {metrics['requests']} ({metrics['requests_per_second']:.2f}/s), "
+          f"retries: {metrics['retries']}, failures: {metrics['failures']}")
+    print(f"Downloaded: {metrics['bytes'] / 1024 / 1024:.1f} MB, records: {metrics['records']} "
+          f"({metrics['records_per_second']:.2f}/s)")
+    for stage, summary in metrics['stages'].items():
+        print(f"{stage:>6}: n={summary['count']} mean={summary['mean'] * 1000:.1f}ms "
+              f"p50={summary['p50'] * 1000:.1f}ms p99={summary['p99'] * 1000:.1f}ms "
+              f"total={summary['sum']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Sharded SmartJob.az crawl with lease-based work distribution
+
+A coordinator puts listing pages into a SQLite lease table. Any number of
+worker processes claim tasks with a time-limited lease. Each finished listing
+page adds one task per resume, and a worker that dies simply lets its lease
+expire, so the task goes back to the queue until it has used its attempts. All workers draw request slots from one pacing
+row in the same database, which keeps a crawl-wide rate cap however many
+workers run. Results are stored with their page and position, and the merge
+step writes them out in the same order as a single-process crawl.
+
+The lease table is a SQLite database in WAL mode, which needs shared memory
+between its users, so all workers must run on the host that holds the
+database. WAL does not work on network filesystems such as NFS or SMB.
+
+Usage:
+    python sharded_crawl.py init --pages 1 93 --rate 2
+    python sharded_crawl.py work --processes 4
+    python sharded_crawl.py status
+    python sharded_crawl.py merge --output smartjob_all_candidates_complete --pretty-json [--allow-partial]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from smartjob_scraper import SmartJobScraper
+from streaming_writer import StreamingWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, kind, page, position);
+CREATE TABLE IF NOT EXISTS pacing (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    rate REAL NOT NULL,
+    next_at REAL NOT NULL
+);
+"""
+
+# Task kinds
+PAGE = 'page'
+RESUME = 'resume'
+
+# Status values
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+@dataclass
+class Lease:
+    kind: str
+    key: str
+    page: int
+    position: int
+    payload: Optional[str]
+    attempts: int
+    worker: Optional[str] = None
+
+
+class LeaseQueue:
+    def __init__(self, path, lease_seconds: float = 120, max_attempts: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        # Single host only: WAL keeps its index in shared memory next to the database
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        
+        # Queues of earlier versions have no error column
+        if 'error' not in {row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')}:
+            self.conn.execute('ALTER TABLE tasks ADD COLUMN error TEXT')
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database lock up front"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def init(self, start_page: int, end_page: int, rate: float, reset: bool = False):
+        """Queue a page range and set the crawl-wide request rate"""
+        with self.transaction():
+            if reset:
+                self.conn.execute('DELETE FROM tasks')
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO tasks (kind, key, page, position, status, updated_at) VALUES (?, ?, ?, 0, ?, ?)',
+                [(PAGE, str(page), page, PENDING, now()) for page in range(start_page, end_page + 1)]
+            )
+            self.conn.execute(
+                'INSERT INTO pacing (id, rate, next_at) VALUES (1, ?, 0) '
+                'ON CONFLICT(id) DO UPDATE SET rate = excluded.rate', (rate,)
+            )
+
+    def claim(self, worker: str) -> Optional[Lease]:
+        """Lease the next pending or expired task, resumes before new pages
+
+        An expired lease on the last attempt marks its task failed instead, so a
+        task that kills its worker every time is not claimed forever.
+        """
+        with self.transaction():
+            self.conn.execute(
+                'UPDATE tasks SET status = ?, error = ?, lease_expires = NULL, updated_at = ? '
+                'WHERE status = ? AND lease_expires < ? AND attempts >= ?',
+                (FAILED, 'LeaseExpired', now(), LEASED, time.time(), self.max_attempts)
+            )
+            row = self.conn.execute(
+                'SELECT kind, key, page, position, payload, attempts FROM tasks '
+                'WHERE status = ? OR (status = ? AND lease_expires < ?) '
+                'ORDER BY kind = ?, page, position LIMIT 1',
+                (PENDING, LEASED, time.time(), PAGE)
+            ).fetchone()
+            if row is None:
+                return None
+
+            lease = Lease(*row[:5], attempts=row[5] + 1, worker=worker)
+            self.conn.execute(
+                'UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, attempts = ?, updated_at = ? '
+                'WHERE kind = ? AND key = ?',
+                (LEASED, worker, time.time() + self.lease_seconds, lease.attempts, now(), lease.kind, lease.key)
+            )
+        return lease
+
+    # Matches a task only while the lease is still held: expired leases may have been claimed again
+    OWNED = 'WHERE kind = ? AND key = ? AND status = ? AND worker = ? AND attempts = ?'
+
+    def owned(self, lease: Lease) -> tuple:
+        return lease.kind, lease.key, LEASED, lease.worker, lease.attempts
+
+    def renew(self, lease: Lease) -> bool:
+        """Extend a lease that is still held; False once it was lost to another worker"""
+        with self.transaction():
+            cursor = self.conn.execute(
+                f'UPDATE tasks SET lease_expires = ? {self.OWNED}',
+                (time.time() + self.lease_seconds,) + self.owned(lease)
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, lease: Lease, result) -> bool:
+        """Store a task result; a finished page queues one task per resume
+
+        Returns False, and stores nothing, when the lease was lost.
+        """
+        with self.transaction():
+            cursor = self.conn.execute(
+                f'UPDATE tasks SET status = ?, result = ?, error = NULL, lease_expires = NULL, updated_at = ? {self.OWNED}',
+                (DONE, json.dumps(result, ensure_ascii=False), now()) + self.owned(lease)
+            )
+            if cursor.rowcount == 0:
+                return False
+            if lease.kind == PAGE:
+                self.conn.executemany(
+                    'INSERT OR IGNORE INTO tasks (kind, key, page, position, payload, status, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(RESUME, f"{lease.page}:{index}", lease.page, index,
+                      json.dumps(candidate, ensure_ascii=False), PENDING, now())
+                     for index, candidate in enumerate(result)]
+                )
+        return True
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """Give a task back to the queue, or mark it failed after max_attempts; False when the lease was lost"""
+        status = FAILED if lease.attempts >= self.max_attempts else PENDING
+        with self.transaction():
+            cursor = self.conn.execute(
+                f'UPDATE tasks SET status = ?, error = ?, lease_expires = NULL, updated_at = ? {self.OWNED}',
+                (status, error, now()) + self.owned(lease)
+            )
+        return cursor.rowcount > 0
+
+    def wait_turn(self):
+        """Reserve the next request slot under the crawl-wide rate cap and sleep until it"""
+        with self.transaction():
+            rate, next_at = self.conn.execute('SELECT rate, next_at FROM pacing WHERE id = 1').fetchone()
+            slot = max(time.time(), next_at)
+            self.conn.execute('UPDATE pacing SET next_at = ? WHERE id = 1', (slot + 1 / rate,))
+        time.sleep(max(0.0, slot - time.time()))
+
+    def is_finished(self) -> bool:
+        """Whether no task is pending or leased"""
+        row = self.conn.execute('SELECT 1 FROM tasks WHERE status IN (?, ?) LIMIT 1', (PENDING, LEASED)).fetchone()
+        return row is None
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Counts of tasks by kind and status, with expired leases counted separately"""
+        summary = {PAGE: {}, RESUME: {}}
+        for kind, status, count in self.conn.execute('SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status'):
+            summary[kind][status] = count
+        for kind, count in self.conn.execute(
+                'SELECT kind, COUNT(*) FROM tasks WHERE status = ? AND lease_expires < ? GROUP BY kind',
+                (LEASED, time.time())):
+            summary[kind]['expired'] = count
+        return summary
+
+    def failed_pages(self) -> List[Tuple[int, int, str]]:
+        """Listing pages that used all their attempts, with attempts and last error"""
+        return self.conn.execute(
+            'SELECT page, attempts, error FROM tasks WHERE kind = ? AND status = ? ORDER BY page', (PAGE, FAILED)
+        ).fetchall()
+
+    def workers(self) -> Dict[str, int]:
+        """Tasks finished per worker"""
+        return dict(self.conn.execute(
+            'SELECT worker, COUNT(*) FROM tasks WHERE status = ? GROUP BY worker', (DONE,)
+        ))
+
+    def records(self) -> Iterator[Dict]:
+        """Merged candidates in page order; unfinished resumes keep their listing card
+
+        Failed pages have no candidates; see failed_pages(). Failed resumes are marked with the detail_error of their last attempt, like the other engines do.
+        """
+        pages = self.conn.execute(
+            'SELECT page, result FROM tasks WHERE kind = ? AND status = ? ORDER BY page', (PAGE, DONE)
+        ).fetchall()
+        for page, _ in pages:
+            rows = self.conn.execute(
+                'SELECT status, payload, result, error FROM tasks WHERE kind = ? AND page = ? ORDER BY position',
+                (RESUME, page)
+            )
+            for status, payload, result, error in rows:
+                record = json.loads(result if status == DONE else payload)
+                if status == FAILED:
+                    record['detail_error'] = error or 'FetchError'
+                yield record
+
+
+class ShardWorker(SmartJobScraper):
+    def __init__(self, queue: LeaseQueue, worker_id: str, poll_interval: float = 1.0, **kwargs):
+        super().__init__(delay_range=(0, 0), **kwargs)
+        self.queue = queue
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.lease = None
+
+    def before_attempt(self) -> bool:
+        """Take a slot under the crawl-wide rate cap for every attempt, retries included, and keep the lease alive"""
+        self.queue.wait_turn()
+        if self.lease and not self.queue.renew(self.lease):
+            self.logger.warning(f"Lease on {self.lease.kind} {self.lease.key} expired and was taken over")
+        return True
+
+    def process(self, lease: Lease):
+        """Run one leased task"""
+        self.lease = lease
+        if lease.kind == PAGE:
+            url = f"{self.base_url}/resumes?page={lease.page}"
+            content = self.fetch(url)
+            candidates = self.parse_listing(content) if content else None
+            if candidates is None:
+                self.queue.fail(lease, self.fetch_errors.pop(url, 'FetchError'))
+                return
+            if self.queue.complete(lease, candidates):
+                self.logger.info(f"Found {len(candidates)} candidates on page {lease.page}")
+            return
+
+        candidate = json.loads(lease.payload)
+        content = self.fetch(candidate['profile_url'])
+        if content is None:
+            self.queue.fail(lease, self.fetch_errors.pop(candidate['profile_url'], 'FetchError'))
+            return
+        if self.queue.complete(lease, self.parse_resume(candidate, content)):
+            self.metrics.count('records')
+
+    def run(self) -> int:
+        """Claim and run tasks until the queue is finished; returns the number of tasks run"""
+        processed = 0
+        while True:
+            lease = self.queue.claim(self.worker_id)
+            if lease is None:
+                if self.queue.is_finished():
+                    break
+                # Other workers still hold leases that may expire and come back
+                time.sleep(self.poll_interval)
+                continue
+
+            self.process(lease)
+            processed += 1
+
+        self.logger.info(f"Worker {self.worker_id} finished after {processed} tasks")
+        self.finish_run()
+        return processed
+
+
+def run_worker(queue_path: str, worker_id: str, lease_seconds: float, output_dir: str, **kwargs) -> int:
+    """Run one worker with its own log and metrics under output_dir/workers/"""
+    worker_dir = Path(output_dir) / 'workers' / worker_id
+    worker_dir.mkdir(parents=True, exist_ok=True)
+    queue = LeaseQueue(queue_path, lease_seconds=lease_seconds)
+    worker = ShardWorker(queue, worker_id, output_dir=worker_dir, **kwargs)
+    try:
+        return worker.run()
+    finally:
+        queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded SmartJob.az crawl with a shared lease table')
+    parser.add_argument('--queue', default='scraped_data/crawl_queue.db', help='Lease table database (default: scraped_data/crawl_queue.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    init = commands.add_parser('init', help='Queue a page range')
+    init.add_argument('--pages', type=int, nargs=2, default=[1, 93], metavar=('START', 'END'), help='Page range (default: 1 93)')
+    init.add_argument('--rate', type=float, default=1.0, help='Requests per second across all workers (default: 1)')
+    init.add_argument('--reset', action='store_true', help='Drop all existing tasks and results first')
+
+    work = commands.add_parser('work', help='Run workers until the queue is finished')
+    work.add_argument('--processes', type=int, default=1, help='Worker processes on this host (default: 1)')
+    work.add_argument('--worker-id', default=None, help='Worker name prefix (default: HOSTNAME-PID)')
+    work.add_argument('--lease', type=float, default=120, help='Lease duration in seconds (default: 120)')
+    work.add_argument('--parser', choices=SmartJobScraper.PARSERS, default='bs4', help='Resume page parser backend (default: bs4)')
+    work.add_argument('--output-dir', default='scraped_data', help='Directory for worker logs and metrics (default: scraped_data)')
+    work.add_argument('--base-url', default='https://smartjob.az', help='Site to crawl (default: https://smartjob.az)')
+
+    commands.add_parser('status', help='Show queue progress')
+
+    merge = commands.add_parser('merge', help='Write the merged results')
+    merge.add_argument('--output-dir', default='scraped_data', help='Output directory (default: scraped_data)')
+    merge.add_argument('--output', default='smartjob_candidates_sharded', help='Output file name without extension')
+    merge.add_argument('--pretty-json', action='store_true', help='Also write the pretty JSON array')
+    merge.add_argument('--allow-partial', action='store_true', help='Merge even when listing pages failed')
+
+    args = parser.parse_args()
+
+    queue = LeaseQueue(args.queue)
+
+    if args.command == 'init':
+        queue.init(args.pages[0], args.pages[1], args.rate, reset=args.reset)
+        print(f"✅ Queued pages {args.pages[0]}-{args.pages[1]} in {args.queue} at {args.rate} requests/second")
+
+    elif args.command == 'work':
+        prefix = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        worker_ids = [prefix] if args.processes == 1 else [f"{prefix}-{index}" for index in range(1, args.processes + 1)]
+        options = {'lease_seconds': args.lease, 'output_dir': args.output_dir, 'parser': args.parser, 'base_url': args.base_url}
+
+        print(f"🚀 Starting {len(worker_ids)} worker(s) on {args.queue}")
+        if len(worker_ids) == 1:
+            run_worker(args.queue, worker_ids[0], **options)
+        else:
+            context = multiprocessing.get_context('spawn')
+            processes = [context.Process(target=run_worker, args=(args.queue, worker_id), kwargs=options)
+                         for worker_id in worker_ids]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+        print("✅ Queue finished" if queue.is_finished() else "⚠️  Workers stopped before the queue was finished")
+
+    elif args.command == 'status':
+        for kind, counts in queue.summary().items():
+            print(f"{kind}s: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+        for worker, count in sorted(queue.workers().items()):
+            print(f"  {worker}: {count} tasks")
+
+    elif args.command == 'merge':
+        if not queue.is_finished():
+            print("⚠️  Queue is not finished; unfinished resumes are saved as listing cards")
+        failed_pages = queue.failed_pages()
+        for page, attempts, error in failed_pages:
+            print(f"❌ Page {page} failed after {attempts} attempts ({error}); its candidates are missing")
+        if failed_pages and not args.allow_partial:
+            queue.close()
+            parser.error(f"{len(failed_pages)} listing pages failed; pass --allow-partial to merge without them")
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        writer = StreamingWriter(output_dir, args.output, SmartJobScraper.PRIORITY_FIELDS)
+        for record in queue.records():
+            writer.write(record)
+        if args.pretty_json:
+            writer.finalize_json()
+        else:
+            writer.close()
+        print(f"✅ Merged {writer.count} candidates into {writer.ndjson_file} and {writer.csv_file}")
+
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
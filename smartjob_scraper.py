@@ -12,53 +12,52 @@ Usage:
 
 import requests
 from bs4 import BeautifulSoup
-import json
 import csv
 import time
 import random
 from urllib.parse import urljoin, urlparse
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 import argparse
+import cProfile
 import logging
+import pstats
 from pathlib import Path
 
-class SmartJobScraper:
-    def __init__(self, delay_range=(1, 3), output_dir="scraped_data"):
-        self.base_url = "https://smartjob.az"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.delay_range = delay_range
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
-        
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.output_dir / 'scraper.log'),
-                logging.StreamHandler()
-            ]
-        )
+import change_feed
+import fast_parser
+from crawl_state import DEAD_LETTERS, CrawlState, DeadLetters
+from records import Candidate, as_dict, as_record
+from record_store import write_store
+from rate_control import RETRY_STATUSES, AdaptiveThrottle, backoff_delay, parse_retry_after
+from response_cache import CachedResponse, ResponseCache
+from run_metrics import RunMetrics
+from streaming_writer import StreamingWriter, csv_row, ordered_fieldnames, write_json_array
+import columnar_export
+
+class PageParser:
+    """Turns raw listing and resume pages into candidate records
+
+    Keeps no session, log file, crawl state or metrics, so the pipeline engine
+    can build one in every parse worker process.
+    """
+    
+    PARSERS = ('bs4', 'lxml')
+
+    def __init__(self, parser="bs4", base_url="https://smartjob.az"):
+        if parser not in self.PARSERS:
+            raise ValueError(f"Unknown parser backend: {parser}")
+        self.parser = parser
+        self.base_url = base_url
         self.logger = logging.getLogger(__name__)
 
-    def get_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
-        """Fetch a page with retries and error handling"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
-            except requests.RequestException as e:
-                self.logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
-                if attempt < retries - 1:
-                    time.sleep(random.uniform(*self.delay_range) * 2)
-        
-        self.logger.error(f"Failed to fetch {url} after {retries} attempts")
-        return None
+    def parse_listing(self, content: bytes) -> List[Dict]:
+        """Extract the candidate cards of a raw listing page"""
+        return self.extract_candidates_from_listing(self.parse_html(content))
+
+    def parse_html(self, content: bytes) -> BeautifulSoup:
+        """Build the document tree for a fetched page"""
+        return BeautifulSoup(content, 'html.parser')
 
     def extract_candidates_from_listing(self, soup: BeautifulSoup) -> List[Dict]:
         """Extract candidate basic info from listing page"""
@@ -119,15 +118,14 @@ class SmartJobScraper:
         
         return candidates
 
-    def extract_detailed_info(self, candidate: Dict) -> Dict:
-        """Extract detailed information from individual resume page"""
-        if not candidate.get('profile_url'):
-            return candidate
-        
-        soup = self.get_page(candidate['profile_url'])
-        if not soup:
-            return candidate
-        
+    def parse_resume(self, candidate: Dict, content: bytes) -> Dict:
+        """Merge a raw resume page into the candidate with the selected parser backend"""
+        if self.parser == 'lxml':
+            return fast_parser.parse_detailed_info(candidate, content, self.logger)
+        return self.parse_detailed_info(candidate, self.parse_html(content))
+
+    def parse_detailed_info(self, candidate: Dict, soup: BeautifulSoup) -> Dict:
+        """Merge the sections of a fetched resume page into the candidate"""
         try:
             # Extract detailed description
             about_section = soup.find('h2', string='Mənim haqqımda')
@@ -253,94 +251,538 @@ class SmartJobScraper:
             
         except Exception as e:
             self.logger.error(f"Error extracting detailed info from {candidate['profile_url']}: {e}")
+            candidate['detail_error'] = type(e).__name__
         
         return candidate
 
-    def scrape_pages(self, start_page: int = 1, end_page: int = 93) -> List[Dict]:
+
+class SmartJobScraper(PageParser):
+    # Priority order for important fields in CSV output
+    PRIORITY_FIELDS = [
+        'name', 'phone', 'salary', 'age', 'job_category', 'category_name',
+        'work_experience', 'education_level', 'profile_url', 'resume_id',
+        'last_updated', 'skills', 'social_links', 'about', 'languages', 
+        'education', 'experience', 'detail_error'
+    ]
+
+    def __init__(self, delay_range=(1, 3), output_dir="scraped_data", parser="bs4", state_file=None, resume=False,
+                 cache_dir=None, cache_size=1024 * 1024 * 1024, replay=False, previous_snapshot=None,
+                 columnar=None, record_store=False, change_feed=False, rate=None, adaptive=False, max_rate=None, metrics_interval=30, profile=False,
+                 base_url="https://smartjob.az"):
+        super().__init__(parser=parser, base_url=base_url)
+        if replay and not cache_dir:
+            raise ValueError("Replay needs a response cache directory")
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        self.delay_range = delay_range
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        
+        # Setup logging
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler(self.output_dir / 'scraper.log'),
+                logging.StreamHandler()
+            ]
+        )
+        
+        # Durable crawl progress, only kept when a state file is given
+        self.state = CrawlState(state_file, resume=resume) if state_file else None
+        
+        # Failed pages and resumes for retry_failed.py, kept with or without a crawl state
+        self.dead_letters = DeadLetters(self.output_dir / DEAD_LETTERS, resume=resume)
+        
+        # Raw response cache; replay serves every page from it without network access
+        self.cache = ResponseCache(cache_dir, max_bytes=cache_size) if cache_dir else None
+        self.replay = replay
+        if replay:
+            self.delay_range = (0, 0)
+        
+        # Records of an earlier run; unchanged resumes are carried forward instead of fetched
+        self.previous = self.load_snapshot(previous_snapshot) if previous_snapshot else {}
+        self.carried_forward = 0
+        
+        # Class of the last error of every URL that could not be fetched, until its page or resume is recorded
+        self.fetch_errors = {}
+        
+        # Append-only output opened by open_stream; replaces periodic save_data snapshots
+        self.sink = None
+        
+        # Extra Parquet/Arrow copy of every saved file
+        if columnar and columnar not in columnar_export.FORMATS:
+            raise ValueError(f"Unknown columnar format: {columnar}")
+        self.columnar = columnar
+        
+        # Extra record store copy (NAME.records + NAME.idx) of every saved file, for lookups by resume
+        self.record_store = record_store
+        
+        # NAME.changes.ndjson of every saved file against the NAME.manifest.json of the previous run
+        self.change_feed = change_feed
+        
+        # Requests per second; paces the async engines and starts the adaptive throttle
+        self.rate = rate or self.request_rate()
+        
+        # AIMD throttle that replaces the fixed delays, following what the server tolerates
+        self.throttle = AdaptiveThrottle(self.rate, max_rate=max_rate) if adaptive and not replay else None
+        
+        # Request budget (crawl_frontier.RequestBudget) charged for every attempt, retries included
+        self.budget = None
+        
+        # Stage timings and counters, exported to run_metrics.json/.prom; None disables export
+        self.metrics = RunMetrics(self.output_dir, interval=metrics_interval)
+        
+        # cProfile of the whole run, saved by finish_run
+        self.profiler = cProfile.Profile() if profile else None
+        if self.profiler:
+            self.profiler.enable()
+
+    def request_rate(self) -> float:
+        """Request rate implied by the delay range, capped at 100 requests/second"""
+        return 2 / max(self.delay_range[0] + self.delay_range[1], 0.02)
+
+    def current_rate(self) -> float:
+        return self.throttle.rate if self.throttle else self.rate
+
+    def pause(self):
+        """Rate limiting between requests; the adaptive throttle paces in fetch instead"""
+        if not self.throttle:
+            time.sleep(random.uniform(*self.delay_range))
+
+    def check_response(self, status: int, headers, latency: float) -> Optional[float]:
+        """Feed a response to the throttle and return the Retry-After of a 429/5xx"""
+        if status in RETRY_STATUSES:
+            retry_after = parse_retry_after(headers.get('Retry-After'))
+            if self.throttle:
+                self.throttle.on_throttle(retry_after)
+            return retry_after
+        if self.throttle and status < 400:
+            self.throttle.on_success(latency)
+        return None
+
+    def fetch_started(self, attempt: int) -> float:
+        """Count a request attempt and return its start time"""
+        self.metrics.count('requests')
+        if attempt:
+            self.metrics.count('retries')
+        if self.throttle:
+            self.metrics.gauges.update(self.throttle.gauges())
+        else:
+            self.metrics.gauges['request_rate'] = self.rate
+        return time.monotonic()
+
+    def fetch_done(self, started: float, size: int = 0) -> float:
+        """Record the duration and body size of a request attempt"""
+        latency = time.monotonic() - started
+        self.metrics.observe('fetch', latency)
+        self.metrics.count('bytes', size)
+        return latency
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with jitter, never shorter than Retry-After"""
+        delay = backoff_delay(attempt, base=max(self.delay_range[0] + self.delay_range[1], 1), retry_after=retry_after)
+        if retry_after:
+            self.logger.info(f"Server asked to retry after {retry_after:.0f}s, waiting {delay:.1f}s")
+        return delay
+
+    def cached_response(self, url: str) -> Optional[CachedResponse]:
+        """Cached copy of a page, if the response cache is enabled"""
+        if not self.cache:
+            return None
+        cached = self.cache.get(url)
+        if cached is None and self.replay:
+            self.logger.error(f"Not in response cache: {url}")
+        return cached
+
+    def store_response(self, url: str, content: bytes, headers) -> bytes:
+        """Add a fetched page to the response cache"""
+        if self.cache:
+            self.cache.put(url, content, headers.get('ETag'), headers.get('Last-Modified'))
+        return content
+
+    @staticmethod
+    def error_class(error: Exception) -> str:
+        """Dead-letter label of a failed request: the HTTP status or the exception type"""
+        status = getattr(error, 'status', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+        return f"HTTP {status}" if status else type(error).__name__
+
+    def fetch_failed(self, url: str, retries: int, error: str):
+        """Count a URL that could not be fetched and remember why"""
+        self.logger.error(f"Failed to fetch {url} after {retries} attempts")
+        self.metrics.count('failures')
+        self.fetch_errors[url] = error
+
+    def before_attempt(self) -> bool:
+        """Wait until the next request attempt may be sent; False when the budget allows no more"""
+        if self.budget is not None and not self.budget.take():
+            return False
+        if self.throttle:
+            self.throttle.wait()
+        return True
+
+    def fetch(self, url: str, retries: int = 3) -> Optional[bytes]:
+        """Fetch a raw page body with retries and error handling"""
+        cached = self.cached_response(url)
+        if self.replay:
+            if cached is None:
+                self.fetch_errors[url] = 'NotCached'
+            return cached.body if cached else None
+        
+        headers = cached.conditional_headers() if cached else {}
+        error = None
+        attempts = 0
+        for attempt in range(retries):
+            if not self.before_attempt():
+                error = error or 'BudgetExhausted'
+                break
+            attempts += 1
+            retry_after = None
+            started = self.fetch_started(attempt)
+            try:
+                response = self.session.get(url, timeout=10, headers=headers)
+                latency = self.fetch_done(started, len(response.content))
+                retry_after = self.check_response(response.status_code, response.headers, latency)
+                response.raise_for_status()
+                if response.status_code == 304 and cached:
+                    self.metrics.count('not_modified')
+                    return cached.body
+                return self.store_response(url, response.content, response.headers)
+            except requests.RequestException as e:
+                if not isinstance(e, requests.HTTPError):
+                    self.fetch_done(started)
+                    if self.throttle:
+                        self.throttle.on_error()
+                self.logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
+                error = self.error_class(e)
+                if attempt < retries - 1:
+                    time.sleep(self.retry_delay(attempt, retry_after))
+        
+        self.fetch_failed(url, attempts, error)
+        return None
+
+    def get_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
+        """Fetch and parse a page"""
+        content = self.fetch(url, retries)
+        if content is None:
+            return None
+        return self.parse_html(content)
+
+    def parse_listing(self, content: bytes) -> List[Dict]:
+        """Extract the candidate cards of a raw listing page, timed as the parse stage"""
+        with self.metrics.time('parse'):
+            return super().parse_listing(content)
+
+    def extract_detailed_info(self, candidate: Dict) -> Dict:
+        """Extract detailed information from individual resume page"""
+        if not candidate.get('profile_url'):
+            return candidate
+        
+        if self.state:
+            self.state.start_resume(candidate)
+        
+        content = self.fetch(candidate['profile_url'])
+        if content is not None:
+            candidate = self.parse_resume(candidate, content)
+        
+        return self.finish_resume(candidate, content is not None)
+
+    def finish_resume(self, candidate: Dict, fetched: bool) -> Dict:
+        """Mark a record whose resume could not be fetched or parsed, and record the outcome"""
+        if not fetched:
+            candidate['detail_error'] = self.fetch_errors.pop(candidate['profile_url'], 'FetchError')
+        error = candidate.get('detail_error')
+        if error:
+            self.dead_letters.fail_resume(candidate, error)
+        else:
+            self.dead_letters.recover_resume(candidate)
+        if self.state:
+            self.state.finish_resume(candidate, done=error is None, error=error)
+        return candidate
+
+    def finish_listing(self, page: int, url: str, candidates: Optional[List[Dict]]):
+        """Record the cards of a listing page, or the error class when it could not be fetched"""
+        error = self.fetch_errors.pop(url, None)
+        if candidates is None:
+            self.dead_letters.fail_pages([page], error or 'FetchError')
+        else:
+            self.dead_letters.recover_page(page)
+        if self.state:
+            self.state.finish_page(page, candidates, error=error)
+
+    def load_snapshot(self, path) -> Dict[str, Dict]:
+        """Load the detailed records of an earlier JSON, NDJSON or CSV output, keyed by resume"""
+        from consolidate import iter_records
+
+        snapshot = {
+            CrawlState.resume_key(record): as_record(record)
+            for record in iter_records(Path(path))
+            if record.get('profile_url') and self.is_detailed(record)
+        }
+        self.logger.info(f"Loaded {len(snapshot)} detailed records from {path}")
+        return snapshot
+
+    @staticmethod
+    def is_detailed(candidate: Dict) -> bool:
+        """Whether a record went through parse_detailed_info"""
+        return all(key in candidate for key in ('languages', 'education', 'experience', 'skills'))
+
+    def finished_resume(self, candidate: Dict) -> Optional[Dict]:
+        """Detailed record of a resume that does not need to be fetched again"""
+        if self.state:
+            finished = self.state.get_resume(candidate)
+            if finished is not None:
+                return finished
+        
+        previous = self.previous.get(CrawlState.resume_key(candidate))
+        if previous is not None and candidate.get('last_updated') and \
+                previous.get('last_updated') == candidate['last_updated']:
+            self.carried_forward += 1
+            return previous
+        return None
+
+    def parse_resume(self, candidate: Dict, content: bytes) -> Dict:
+        """Merge a raw resume page into the candidate, timed as the parse stage"""
+        with self.metrics.time('parse'):
+            return super().parse_resume(candidate, content)
+
+    def get_listing(self, page: int) -> Optional[List[Dict]]:
+        """Fetch the candidate cards of a listing page, reusing recorded progress"""
+        if self.state:
+            candidates = self.state.get_listing(page)
+            if candidates is not None:
+                return candidates
+            self.state.start_page(page)
+        
+        url = f"{self.base_url}/resumes?page={page}"
+        content = self.fetch(url)
+        candidates = self.parse_listing(content) if content else None
+        
+        self.finish_listing(page, url, candidates)
+        return candidates
+
+    def scrape_pages(self, start_page: int = 1, end_page: int = 93) -> List[Candidate]:
         """Scrape multiple pages of candidates"""
         all_candidates = []
         
         for page in range(start_page, end_page + 1):
             self.logger.info(f"Scraping page {page}/{end_page}")
             
-            url = f"{self.base_url}/resumes?page={page}"
-            soup = self.get_page(url)
+            candidates = self.get_listing(page)
             
-            if not soup:
+            if candidates is None:
                 continue
             
-            candidates = self.extract_candidates_from_listing(soup)
             self.logger.info(f"Found {len(candidates)} candidates on page {page}")
             
             # Extract detailed info for each candidate
+            page_candidates = []
             for i, candidate in enumerate(candidates, 1):
+                finished = self.finished_resume(candidate)
+                if finished is not None:
+                    page_candidates.append(finished)
+                    continue
+                
                 self.logger.info(f"Processing candidate {i}/{len(candidates)} on page {page}: {candidate.get('name', 'Unknown')}")
                 
                 detailed_candidate = self.extract_detailed_info(candidate)
-                all_candidates.append(detailed_candidate)
+                page_candidates.append(detailed_candidate)
                 
                 # Rate limiting
-                time.sleep(random.uniform(*self.delay_range))
+                self.pause()
             
-            # Save progress periodically
-            if page % 5 == 0:
-                self.save_data(all_candidates, f"candidates_pages_{start_page}-{page}")
+            self.collect_page(all_candidates, page_candidates, start_page, page)
             
             # Rate limiting between pages
-            time.sleep(random.uniform(*self.delay_range))
+            self.pause()
         
         return all_candidates
 
+    def collect_page(self, all_candidates: List[Candidate], page_candidates: List[Dict], start_page: int, page: int,
+                     save_progress: bool = True):
+        """Add a scraped page to the run output, as compact Candidate records, and save progress periodically"""
+        all_candidates.extend(as_record(candidate) for candidate in page_candidates)
+        self.metrics.count('records', len(page_candidates))
+        if self.sink:
+            with self.metrics.time('save'):
+                for candidate in page_candidates:
+                    self.sink.write(as_dict(candidate))
+                # Make progress durable periodically
+                if save_progress and page % 5 == 0:
+                    self.sink.checkpoint()
+        elif save_progress and page % 5 == 0:
+            # Save progress periodically
+            self.save_data(all_candidates, f"candidates_pages_{start_page}-{page}")
+
+    def open_stream(self, filename: str) -> StreamingWriter:
+        """Append every scraped record to filename.ndjson and filename.csv"""
+        self.sink = StreamingWriter(self.output_dir, filename, self.PRIORITY_FIELDS)
+        return self.sink
+
+    def close_stream(self, pretty_json: bool = False):
+        """Finish the streamed output, optionally writing the pretty JSON array"""
+        with self.metrics.time('save'):
+            if pretty_json:
+                self.sink.finalize_json()
+            else:
+                self.sink.close()
+            self.logger.info(f"Streamed {self.sink.count} candidates to {self.sink.filename}.ndjson and {self.sink.filename}.csv")
+
+            # Each copy reads the stream back one record at a time instead of loading it
+            from consolidate import iter_records
+            if self.columnar:
+                self.save_columnar(iter_records(self.sink.ndjson_file), self.sink.filename)
+            if self.record_store:
+                self.save_record_store(iter_records(self.sink.ndjson_file), self.sink.filename)
+            if self.change_feed:
+                self.save_change_feed(iter_records(self.sink.ndjson_file), self.sink.filename)
+
+    def save_columnar(self, candidates: Iterable[Dict], filename: str):
+        """Save candidates data to a Parquet or Arrow IPC file"""
+        path = self.output_dir / f"{filename}{columnar_export.FORMATS[self.columnar]}"
+        count = columnar_export.write_records((as_dict(candidate) for candidate in candidates), path, self.columnar)
+        self.logger.info(f"Saved {count} candidates to {path.name}")
+
+    def save_record_store(self, candidates: Iterable[Dict], filename: str):
+        """Save candidates data to an append-only record store with a resume index"""
+        path = self.output_dir / f"{filename}.records"
+        store = write_store(path, (as_dict(candidate) for candidate in candidates))
+        count = len(store)
+        store.close()
+        self.logger.info(f"Saved {count} candidates to {path.name}")
+
+    def save_change_feed(self, candidates: Iterable[Dict], filename: str):
+        """Save the changes since the previous run's manifest of filename, then the new manifest"""
+        # Candidates of failed listing pages are missing, not removed
+        keep_missing = bool(self.dead_letters.failed_pages())
+        counts = change_feed.publish((as_dict(candidate) for candidate in candidates),
+                                     self.output_dir / f"{filename}.json", keep_missing=keep_missing)
+        self.logger.info(f"Saved change feed to {filename}{change_feed.FEED_SUFFIX}: "
+                         f"{counts['added']} added, {counts['modified']} modified, {counts['removed']} removed")
+
+    def finish_run(self):
+        """Export the final run metrics and, with --profile, the run profile"""
+        if self.profiler:
+            self.profiler.disable()
+            profile_file = self.output_dir / 'profile.prof'
+            self.profiler.dump_stats(profile_file)
+            with open(self.output_dir / 'profile.txt', 'w', encoding='utf-8') as f:
+                pstats.Stats(str(profile_file), stream=f).sort_stats('cumulative').print_stats(40)
+            self.logger.info(f"Saved profile to {profile_file} (summary in profile.txt)")
+        
+        self.metrics.write()
+
     def save_data(self, candidates: List[Dict], filename: str):
         """Save candidates data to JSON and CSV files"""
-        # Save as JSON
-        json_file = self.output_dir / f"{filename}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(candidates, f, ensure_ascii=False, indent=2)
-        
-        # Save as CSV
-        if candidates:
-            csv_file = self.output_dir / f"{filename}.csv"
-            fieldnames = set()
-            for candidate in candidates:
-                fieldnames.update(candidate.keys())
+        with self.metrics.time('save'):
+            # Save as JSON
+            json_file = self.output_dir / f"{filename}.json"
+            with open(json_file, 'w', encoding='utf-8') as f:
+                write_json_array((as_dict(candidate) for candidate in candidates), f)
             
-            # Define priority order for important fields
-            priority_fields = [
-                'name', 'phone', 'salary', 'age', 'job_category', 'category_name',
-                'work_experience', 'education_level', 'profile_url', 'resume_id',
-                'last_updated', 'skills', 'social_links', 'about', 'languages', 
-                'education', 'experience'
-            ]
+            # Save as CSV
+            if candidates:
+                csv_file = self.output_dir / f"{filename}.csv"
+                fieldnames = set()
+                for candidate in candidates:
+                    fieldnames.update(candidate.keys())
             
-            # Order fields: priority first, then alphabetical for the rest
-            ordered_fields = []
-            remaining_fields = set(fieldnames)
+                # Order fields: priority first, then alphabetical for the rest
+                fieldnames = ordered_fieldnames(fieldnames, self.PRIORITY_FIELDS)
             
-            for field in priority_fields:
-                if field in remaining_fields:
-                    ordered_fields.append(field)
-                    remaining_fields.remove(field)
+                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                
+                    for candidate in candidates:
+                        writer.writerow(csv_row(as_dict(candidate)))
             
-            # Add any remaining fields alphabetically
-            ordered_fields.extend(sorted(list(remaining_fields)))
-            fieldnames = ordered_fields
+            self.logger.info(f"Saved {len(candidates)} candidates to {filename}.json and {filename}.csv")
             
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for candidate in candidates:
-                    # Convert lists and dicts to strings for CSV
-                    row = {}
-                    for key, value in candidate.items():
-                        if isinstance(value, (list, dict)):
-                            row[key] = json.dumps(value, ensure_ascii=False)
-                        else:
-                            row[key] = value
-                    writer.writerow(row)
-        
-        self.logger.info(f"Saved {len(candidates)} candidates to {filename}.json and {filename}.csv")
+            if self.columnar:
+                self.save_columnar(candidates, filename)
+            if self.record_store:
+                self.save_record_store(candidates, filename)
+            if self.change_feed:
+                self.save_change_feed(candidates, filename)
+
+
+def create_scraper(engine: str = 'sync', concurrency: int = 10, rate: Optional[float] = None,
+                   parse_workers: Optional[int] = None, **kwargs) -> SmartJobScraper:
+    """Build a scraper for the requested fetch engine"""
+    if engine == 'pipeline':
+        from pipeline_scraper import PipelineSmartJobScraper
+        return PipelineSmartJobScraper(concurrency=concurrency, rate=rate, parse_workers=parse_workers, **kwargs)
+    if engine == 'async':
+        from async_scraper import AsyncSmartJobScraper
+        return AsyncSmartJobScraper(concurrency=concurrency, rate=rate, **kwargs)
+    return SmartJobScraper(rate=rate, **kwargs)
+
+def create_scraper_from_args(args: argparse.Namespace, output_dir: str, **kwargs) -> SmartJobScraper:
+    """Build a scraper from the options registered by add_scraper_arguments"""
+    cache_dir = args.cache_dir
+    if not cache_dir and (args.cache or args.replay):
+        cache_dir = Path(output_dir) / 'http_cache'
+    kwargs.setdefault('state_file', args.state_file or (Path(output_dir) / 'crawl_state.db' if args.resume else None))
+    
+    return create_scraper(
+        engine=args.engine,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        parse_workers=args.parse_workers,
+        parser=args.parser,
+        output_dir=output_dir,
+        resume=args.resume,
+        cache_dir=cache_dir,
+        cache_size=args.cache_size * 1024 * 1024,
+        replay=args.replay,
+        previous_snapshot=args.incremental,
+        columnar=args.columnar,
+        record_store=args.record_store,
+        change_feed=args.change_feed,
+        adaptive=args.adaptive,
+        max_rate=args.max_rate,
+        metrics_interval=args.metrics_interval,
+        profile=args.profile,
+        **kwargs
+    )
+
+def add_scraper_arguments(parser: argparse.ArgumentParser):
+    """Register the scraper options shared by all entry points"""
+    parser.add_argument('--engine', choices=['sync', 'async', 'pipeline'], default='sync', help='Fetch engine (default: sync)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight for the async engines (default: 10)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Requests per second for the async engines, or the starting rate with --adaptive (default: derived from --delay)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Adapt the request rate to server latency and 429/5xx responses instead of fixed delays')
+    parser.add_argument('--max-rate', type=float, default=None, help='Upper bound for --adaptive in requests/second (default: 10x the starting rate)')
+    parser.add_argument('--parse-workers', type=int, default=None, help='Parser processes for the pipeline engine (default: CPU count)')
+    parser.add_argument('--parser', choices=SmartJobScraper.PARSERS, default='bs4', help='Resume page parser backend (default: bs4)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Record progress in the crawl state and skip work finished by an interrupted run')
+    parser.add_argument('--state-file', default=None,
+                        help='Record progress and failures in this crawl state database (default with --resume: OUTPUT_DIR/crawl_state.db)')
+    parser.add_argument('--cache', action='store_true', help='Keep raw responses in a local cache and revalidate them')
+    parser.add_argument('--cache-dir', default=None, help='Response cache directory (default: OUTPUT_DIR/http_cache)')
+    parser.add_argument('--cache-size', type=int, default=1024, help='Response cache size cap in MB (default: 1024)')
+    parser.add_argument('--replay', action='store_true', help='Re-run extraction from the response cache without network access')
+    parser.add_argument('--stream', action='store_true',
+                        help='Append records to NDJSON/CSV as they are scraped instead of rewriting snapshot files')
+    parser.add_argument('--pretty-json', action='store_true', help='With --stream, also write the pretty JSON array at the end')
+    parser.add_argument('--columnar', choices=sorted(columnar_export.FORMATS), default=None,
+                        help='Also save every output file as Parquet or Arrow IPC (needs pyarrow)')
+    parser.add_argument('--record-store', action='store_true',
+                        help='Also save every output file as a NAME.records/NAME.idx store for lookups by resume_id')
+    parser.add_argument('--change-feed', action='store_true',
+                        help='Also save NAME.changes.ndjson with the changes since the previous run of every output file')
+    parser.add_argument('--incremental', metavar='SNAPSHOT', default=None,
+                        help='Previous JSON, NDJSON or CSV output; only fetch resumes that are new or whose last_updated changed')
+    parser.add_argument('--metrics-interval', type=float, default=30,
+                        help='Seconds between run_metrics.json/.prom exports, 0 for only at the end (default: 30)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the run with cProfile and save OUTPUT_DIR/profile.prof and profile.txt')
 
 def main():
     parser = argparse.ArgumentParser(description='SmartJob.az Resume Scraper')
@@ -348,10 +790,12 @@ def main():
     parser.add_argument('--start-page', type=int, default=1, help='Starting page number (default: 1)')
     parser.add_argument('--output-dir', default='scraped_data', help='Output directory (default: scraped_data)')
     parser.add_argument('--delay', type=float, nargs=2, default=[1, 3], help='Delay range between requests (default: 1 3)')
+    add_scraper_arguments(parser)
     
     args = parser.parse_args()
     
-    scraper = SmartJobScraper(
+    scraper = create_scraper_from_args(
+        args,
         delay_range=tuple(args.delay),
         output_dir=args.output_dir
     )
@@ -360,18 +804,38 @@ def main():
     
     print(f"Starting scraper...")
     print(f"Pages to scrape: {args.start_page} to {end_page}")
-    print(f"Delay between requests: {args.delay[0]}-{args.delay[1]} seconds")
+    if scraper.throttle:
+        print(f"Adaptive rate: starting at {scraper.rate:.2f}, up to {scraper.throttle.max_rate:.2f} requests/second")
+    else:
+        print(f"Delay between requests: {args.delay[0]}-{args.delay[1]} seconds")
+    if args.engine != 'sync':
+        print(f"{args.engine.capitalize()} engine: {args.concurrency} in flight at {scraper.rate:.2f} requests/second")
     print(f"Output directory: {args.output_dir}")
     
+    filename = f"smartjob_candidates_pages_{args.start_page}-{end_page}"
+    if args.stream:
+        scraper.open_stream(filename)
+    if args.resume:
+        print(f"Resuming from: {scraper.state.path}")
+    if args.replay:
+        print(f"Replaying from cache: {scraper.cache.cache_dir}")
+    
     candidates = scraper.scrape_pages(args.start_page, end_page)
     
     # Final save
-    filename = f"smartjob_candidates_pages_{args.start_page}-{end_page}"
-    scraper.save_data(candidates, filename)
+    if args.stream:
+        scraper.close_stream(pretty_json=args.pretty_json)
+    else:
+        scraper.save_data(candidates, filename)
     
     print(f"\nScraping completed!")
     print(f"Total candidates scraped: {len(candidates)}")
-    print(f"Data saved to: {args.output_dir}/{filename}.json and {args.output_dir}/{filename}.csv")
+    if args.incremental:
+        print(f"Unchanged candidates carried forward: {scraper.carried_forward}")
+    scraper.finish_run()
+    print(f"Run metrics: {scraper.metrics.json_file} and {scraper.metrics.prom_file}")
+    data_format = 'ndjson' if args.stream else 'json'
+    print(f"Data saved to: {args.output_dir}/{filename}.{data_format} and {args.output_dir}/{filename}.csv")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
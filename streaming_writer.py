@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Streaming output for SmartJob.az
+
+Appends each scraped record to NDJSON and CSV files as it arrives, instead of
+re-serializing the whole growing list at every checkpoint. The CSV uses a
+fixed column order, so no pass over the records is needed to build the
+header. Checkpoints flush and fsync both files. The pretty-printed JSON array
+that save_data writes can be produced once at the end by finalize_json.
+
+Usage:
+    python streaming_writer.py FILE.ndjson [FILE.ndjson ...]
+        Write FILE.json next to each NDJSON file
+"""
+
+import argparse
+import csv
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+def csv_row(candidate: Dict) -> Dict:
+    """Convert lists and dicts to JSON strings for CSV"""
+    row = {}
+    for key, value in candidate.items():
+        if isinstance(value, (list, dict)):
+            row[key] = json.dumps(value, ensure_ascii=False)
+        else:
+            row[key] = value
+    return row
+
+
+def ordered_fieldnames(fieldnames: Iterable[str], priority_fields: List[str]) -> List[str]:
+    """CSV column order: priority fields first, then the rest alphabetically"""
+    remaining = set(fieldnames)
+    ordered = [field for field in priority_fields if field in remaining]
+    return ordered + sorted(remaining - set(ordered))
+
+
+def write_json_array(records: Iterable[Dict], f) -> int:
+    """Write records as json.dump(records, f, ensure_ascii=False, indent=2) would, one at a time"""
+    f.write('[')
+    count = 0
+    for record in records:
+        f.write(',\n' if count else '\n')
+        f.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=2), '  '))
+        count += 1
+    f.write('\n]' if count else ']')
+    return count
+
+
+def finalize_json(ndjson_file, json_file=None) -> Path:
+    """Write the records of an NDJSON file as a pretty JSON array
+
+    The output matches json.dump(records, f, ensure_ascii=False, indent=2)
+    but only one record is held in memory at a time.
+    """
+    ndjson_file = Path(ndjson_file)
+    json_file = Path(json_file) if json_file else ndjson_file.with_suffix('.json')
+
+    with open(ndjson_file, encoding='utf-8') as src, open(json_file, 'w', encoding='utf-8') as dst:
+        write_json_array((json.loads(line) for line in src if line.strip()), dst)
+
+    return json_file
+
+
+class StreamingWriter:
+    def __init__(self, output_dir, filename: str, fieldnames: List[str]):
+        self.output_dir = Path(output_dir)
+        self.filename = filename
+        self.ndjson_file = self.output_dir / f"{filename}.ndjson"
+        self.csv_file = self.output_dir / f"{filename}.csv"
+        self.count = 0
+
+        self._ndjson = open(self.ndjson_file, 'w', encoding='utf-8')
+        self._csv = open(self.csv_file, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._csv, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, candidate: Dict):
+        """Append one record to both files"""
+        self._ndjson.write(json.dumps(candidate, ensure_ascii=False))
+        self._ndjson.write('\n')
+        self._writer.writerow(csv_row(candidate))
+        self.count += 1
+
+    def checkpoint(self):
+        """Make everything written so far durable"""
+        for f in (self._ndjson, self._csv):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        if self._ndjson.closed:
+            return
+        self.checkpoint()
+        self._ndjson.close()
+        self._csv.close()
+
+    def finalize_json(self) -> Path:
+        """Close the stream and write the pretty JSON array once"""
+        self.close()
+        return finalize_json(self.ndjson_file, self.output_dir / f"{self.filename}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert streamed NDJSON output to a pretty JSON array')
+    parser.add_argument('files', nargs='+', help='NDJSON files written by --stream')
+
+    args = parser.parse_args()
+
+    for path in args.files:
+        json_file = finalize_json(path)
+        print(f"✅ {path} -> {json_file}")
+
+
+if __name__ == "__main__":
+    main()
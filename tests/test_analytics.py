@@ -0,0 +1,39 @@
+from datetime import date
+
+import numpy as np
+
+from analytics import MAX_EXPERIENCE_MONTHS, MISSING, normalize, parse_duration, parse_experience
+from consolidate import iter_records
+from conftest import ROOT
+
+
+def test_parse_experience_rejects_implausible_values():
+    assert parse_experience('1-3 il') == 12
+    assert parse_experience('1 ildən az') == 0
+    assert parse_experience('2019 il') == MISSING
+    assert parse_experience('20112022 il') == MISSING
+
+
+def test_parse_duration_ongoing():
+    assert parse_duration('01.2018 - 10.2019') == (2018 * 12, 2019 * 12 + 9)
+    assert parse_duration('03.2021 - hələdə işləyirəm') == (2021 * 12 + 2, MISSING)
+    assert parse_duration('03.2021 -') == (2021 * 12 + 2, MISSING)
+
+
+def test_normalize_bundled_results():
+    records = [record for path in sorted((ROOT / 'full_scrape_results').glob('batch_*.json'))
+               for record in iter_records(path)]
+    columns = normalize(records, as_of=date(2025, 9, 1))
+
+    assert len(columns) > 0
+    assert columns.work_experience_months.dtype == np.int32
+    assert columns.work_experience_months.max() <= MAX_EXPERIENCE_MONTHS
+    assert columns.work_experience_months.min() >= MISSING
+
+    # A current job runs until as_of instead of counting as a single month
+    current = next(record for record in records
+                   if len(record.get('experience') or []) == 1
+                   and record['experience'][0].get('duration', '').endswith('hələdə işləyirəm'))
+    start, _ = parse_duration(current['experience'][0]['duration'])
+    row = list(columns.resume_id).index(current['resume_id'])
+    assert columns.experience_months[row] == 2025 * 12 + 8 - start + 1
@@ -0,0 +1,16 @@
+import benchmark
+
+
+def test_crashed_engine_is_recorded_as_failed():
+    # An unknown parser backend makes the engine process raise before it reports
+    result = benchmark.benchmark('sync', 'nope', 'http://127.0.0.1:9', 1, timeout=60)
+
+    assert result == {'engine': 'sync', 'parser': 'nope', 'error': 'process exited with code 1'}
+
+
+def test_engine_run():
+    with benchmark.FixtureServer(latency=0.0) as server:
+        result = benchmark.benchmark('sync', 'lxml', server.url, 1, timeout=60)
+
+    assert 'error' not in result
+    assert result['records'] == result['detailed_records'] == 10
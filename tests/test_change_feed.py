@@ -0,0 +1,67 @@
+import change_feed
+from consolidate import iter_records
+from conftest import ROOT
+from smartjob_scraper import SmartJobScraper
+
+
+def snapshots():
+    """An earlier snapshot and a later one with added, modified, emptied and removed resumes"""
+    records = list(iter_records(ROOT / 'full_scrape_results' / 'batch_01_10.json'))[:200]
+    old = records[:150]
+    new = [dict(record) for record in records[10:]]
+    new[0]['salary'] = '9999 AZN'
+    new[1]['skills'] = []
+    del new[2]['phone']
+    return old, new
+
+
+def by_key(records):
+    return {record['resume_id']: change_feed.normalize(record) for record in records}
+
+
+def test_apply_reproduces_new_snapshot(tmp_path):
+    old, new = snapshots()
+    previous = change_feed.build_manifest(old)
+    changes, manifest = change_feed.diff(new, previous['records'])
+
+    assert manifest['counts'] == {'added': 50, 'modified': 3, 'removed': 10, 'unchanged': 137}
+    assert by_key(change_feed.apply(old, changes)) == by_key(new)
+
+    # Through the files the CLI reads and writes
+    feed_file = tmp_path / 'new.changes.ndjson'
+    change_feed.write_feed(feed_file, changes, manifest)
+    feed = change_feed.read_feed(feed_file)
+    assert next(feed)['op'] == 'snapshot'
+    assert by_key(change_feed.apply(old, feed)) == by_key(new)
+
+    # Against its own manifest the new snapshot has no changes
+    again, _ = change_feed.diff(new, manifest['records'])
+    assert again == []
+
+
+def test_keep_missing_carries_over_missing_resumes(tmp_path):
+    old, new = snapshots()
+    previous = change_feed.build_manifest(old)
+    changes, manifest = change_feed.diff(new, previous['records'], keep_missing=True)
+
+    assert not any(change['op'] == 'remove' for change in changes)
+    assert manifest['counts']['unchanged'] == 137 + 10
+    assert set(manifest['records']) == set(previous['records']) | {record['resume_id'] for record in new}
+
+
+def test_failed_pages_are_not_reported_removed(tmp_path):
+    old, new = snapshots()
+    scraper = SmartJobScraper(output_dir=tmp_path, change_feed=True, metrics_interval=None)
+    scraper.save_change_feed(old, 'candidates')
+
+    scraper.dead_letters.fail_pages([1], 'HTTPError')
+    scraper.save_change_feed(new, 'candidates')
+    feed = list(change_feed.read_feed(tmp_path / 'candidates.changes.ndjson'))
+    assert feed[0]['removed'] == 0
+    assert not any(change['op'] == 'remove' for change in feed)
+
+    # Once the page is recovered, resumes that are still missing are removed
+    scraper.dead_letters.recover_page(1)
+    scraper.save_change_feed(new, 'candidates')
+    feed = list(change_feed.read_feed(tmp_path / 'candidates.changes.ndjson'))
+    assert feed[0]['removed'] == 10
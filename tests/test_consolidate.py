@@ -0,0 +1,27 @@
+import json
+
+from consolidate import Consolidator, collect_inputs, iter_records
+from conftest import ROOT
+from smartjob_scraper import SmartJobScraper
+
+
+def test_consolidate_output_dir(tmp_path):
+    records = list(iter_records(ROOT / 'full_scrape_results' / 'batch_01_10.json'))
+    output_dir = tmp_path / 'run'
+    scraper = SmartJobScraper(output_dir=output_dir, change_feed=True, metrics_interval=0)
+    # The second save writes a change feed with entries against the first one
+    scraper.save_data(records[:50], 'candidates')
+    scraper.save_data(records[25:], 'candidates')
+    scraper.finish_run()
+    (output_dir / 'benchmark_results.json').write_text(json.dumps({'sync': {'seconds': 1.0}}))
+    (output_dir / 'settings.json').write_text(json.dumps({'pages': 5}))
+
+    inputs = collect_inputs([str(output_dir)])
+    assert [path.name for path in inputs] == ['candidates.json']
+
+    consolidator = Consolidator(tmp_path / 'consolidate.db')
+    for path in inputs:
+        consolidator.add_file(path)
+    assert consolidator.read == len(records) - 25
+    assert [record['resume_id'] for record in consolidator] == [record['resume_id'] for record in records[25:]]
+    consolidator.close()
@@ -0,0 +1,26 @@
+from benchmark import FixtureServer
+from crawl_frontier import Frontier, RequestBudget, crawl
+from smartjob_scraper import SmartJobScraper
+
+
+def test_budget_caps_retries(tmp_path):
+    # Every response is a 503, so each fetch would use all three attempts
+    with FixtureServer(error_rate=1.0) as server:
+        scraper = SmartJobScraper(output_dir=tmp_path, delay_range=(0, 0), metrics_interval=None, base_url=server.url)
+        budget = RequestBudget(total=2)
+        candidates = crawl(scraper, 1, 3, Frontier(), budget)
+
+    assert candidates == []
+    assert budget.spent == scraper.metrics.counters['requests'] == 2
+    assert scraper.dead_letters.failed_pages() == [(1, 1, 'HTTP 503')]
+
+
+def test_budget_spent_on_resumes(tmp_path):
+    with FixtureServer() as server:
+        scraper = SmartJobScraper(output_dir=tmp_path, delay_range=(0, 0), metrics_interval=None, base_url=server.url)
+        budget = RequestBudget(total=5)
+        candidates = crawl(scraper, 1, 1, Frontier(), budget)
+
+    assert budget.spent == scraper.metrics.counters['requests'] == 5
+    assert len(candidates) == 10
+    assert sum(1 for candidate in candidates if SmartJobScraper.is_detailed(candidate)) == 4
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from conftest import ROOT
+from smartjob_scraper import PageParser, SmartJobScraper
+
+RESUMES = sorted((ROOT / 'fixtures' / 'resumes').glob('*.html'))
+
+
+@pytest.fixture(scope='module', params=SmartJobScraper.PARSERS)
+def scraper(request, tmp_path_factory):
+    return SmartJobScraper(parser=request.param, output_dir=tmp_path_factory.mktemp(request.param))
+
+
+@pytest.fixture(scope='module', params=PageParser.PARSERS)
+def worker_parser(request):
+    # What the pipeline engine builds in each parse worker process
+    return PageParser(parser=request.param)
+
+
+@pytest.mark.parametrize('page', RESUMES, ids=lambda page: page.stem)
+def test_resume_matches_golden_file(scraper, page):
+    with open(ROOT / 'fixtures' / 'expected' / f'{page.stem}.json', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    record = scraper.parse_resume({'profile_url': f'https://smartjob.az/resume/{page.stem}'}, page.read_bytes())
+
+    assert record == expected
+    # Key order decides the JSON and CSV output, so it has to match as well
+    assert list(record) == list(expected)
+
+
+@pytest.mark.parametrize('page', RESUMES, ids=lambda page: page.stem)
+def test_worker_parser_matches_golden_file(worker_parser, page):
+    with open(ROOT / 'fixtures' / 'expected' / f'{page.stem}.json', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    record = worker_parser.parse_resume({'profile_url': f'https://smartjob.az/resume/{page.stem}'}, page.read_bytes())
+
+    assert record == expected
+    assert list(record) == list(expected)
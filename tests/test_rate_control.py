@@ -0,0 +1,25 @@
+from rate_control import AdaptiveThrottle
+from smartjob_scraper import SmartJobScraper
+
+
+def test_throttle_gauges():
+    throttle = AdaptiveThrottle(2.0)
+    throttle.on_success(0.1)
+    throttle.on_error()
+
+    gauges = throttle.gauges()
+    assert gauges['request_rate'] == throttle.rate < 2.0
+    assert gauges['latency_seconds'] == gauges['baseline_latency_seconds'] == 0.1
+    assert gauges['error_rate'] == AdaptiveThrottle.SMOOTHING
+
+
+def test_throttle_gauges_are_exported(tmp_path):
+    scraper = SmartJobScraper(output_dir=tmp_path, adaptive=True, rate=2.0, metrics_interval=0)
+    scraper.fetch_started(0)
+    scraper.check_response(503, {}, 0.1)
+    scraper.fetch_started(1)
+    scraper.finish_run()
+
+    prometheus = (tmp_path / 'run_metrics.prom').read_text(encoding='utf-8')
+    assert 'smartjob_error_rate 0.2\n' in prometheus
+    assert 'smartjob_request_rate 1\n' in prometheus
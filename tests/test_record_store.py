@@ -0,0 +1,65 @@
+from record_store import LOG_MAGIC, RecordStore, write_store
+
+
+def candidates(count: int, version: int = 1):
+    return [
+        {'resume_id': str(number), 'name': f'Candidate {number}', 'version': version}
+        for number in range(count)
+    ]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'candidates.records'
+    records = candidates(50)
+    with write_store(path, records) as store:
+        assert len(store) == 50
+        assert store.get('17') == records[17]
+        assert '49' in store and '50' not in store
+        assert sorted(store, key=lambda record: int(record['resume_id'])) == records
+
+    # Appended versions replace earlier ones
+    with RecordStore(path) as store:
+        store.append(candidates(10, version=2))
+        assert len(store) == 50
+        assert store.get('3')['version'] == 2
+        assert store.get('30')['version'] == 1
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    path = tmp_path / 'candidates.records'
+    write_store(path, candidates(5)).close()
+    intact = path.stat().st_size
+
+    # A record cut off in the middle of an append
+    with open(path, 'ab') as f:
+        f.write(b'\xff\x00\x00\x00{"resume_id": "9')
+
+    with RecordStore(path) as store:
+        assert len(store) == 5
+        assert store.append(candidates(6, version=2)[5:]) == 1
+        assert store.get('5')['version'] == 2
+        assert [store.get(str(number))['version'] for number in range(5)] == [1] * 5
+    assert path.stat().st_size > intact
+
+    # The index is rebuilt from the complete records only
+    path.with_suffix('.idx').unlink()
+    with open(path, 'ab') as f:
+        f.write(b'\x40\x00')
+    with RecordStore(path) as store:
+        assert len(store) == 6
+
+
+def test_compact_keeps_latest_versions(tmp_path):
+    path = tmp_path / 'candidates.records'
+    with write_store(path, candidates(20)) as store:
+        for version in range(2, 5):
+            store.append(candidates(20, version=version))
+        before = store.size()
+        assert store.compact() == 20
+
+    with RecordStore(path) as store:
+        assert len(store) == 20
+        assert store.size() < before
+        assert {record['version'] for record in store} == {4}
+        assert store.get('0') == {'resume_id': '0', 'name': 'Candidate 0', 'version': 4}
+    assert path.read_bytes().startswith(LOG_MAGIC)
@@ -0,0 +1,70 @@
+import os
+import random
+
+from response_cache import ResponseCache
+
+
+def body(number: int, size: int = 4096) -> bytes:
+    # Random bytes do not compress, so every object has about the same size on disk
+    return random.Random(number).randbytes(size)
+
+
+def test_total_tracks_overwrites_and_shared_bodies(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put('https://smartjob.az/resume/1', body(1), etag='"a"')
+    cache.put('https://smartjob.az/resume/2', body(1))
+    assert cache.summary()['objects'] == 1
+    assert cache.total == cache.total_bytes()
+
+    # Overwriting one URL keeps the body the other still points at
+    cache.put('https://smartjob.az/resume/1', body(2), etag='"b"')
+    assert cache.get('https://smartjob.az/resume/2').body == body(1)
+    assert cache.get('https://smartjob.az/resume/1').etag == '"b"'
+    assert cache.total == cache.total_bytes()
+
+    # Once nothing points at a body its object is deleted
+    cache.put('https://smartjob.az/resume/2', body(2))
+    assert cache.summary() == {'entries': 2, 'objects': 1, 'bytes': cache.total}
+    assert sum(len(files) for _, _, files in os.walk(cache.objects_dir)) == 1
+    cache.close()
+
+    # A reopened cache starts from the same total
+    reopened = ResponseCache(tmp_path)
+    assert reopened.total == cache.total
+    reopened.close()
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10 * 4200)
+    for number in range(10):
+        cache.put(f'https://smartjob.az/resume/{number}', body(number))
+    assert cache.summary()['entries'] == 10
+    cache.get('https://smartjob.az/resume/0')
+
+    for number in range(10, 15):
+        cache.put(f'https://smartjob.az/resume/{number}', body(number))
+        assert cache.total == cache.total_bytes() <= cache.max_bytes
+
+    assert cache.get('https://smartjob.az/resume/0') is not None
+    assert cache.get('https://smartjob.az/resume/1') is None
+    assert cache.get('https://smartjob.az/resume/14') is not None
+    cache.close()
+
+
+def test_corrupt_object_is_dropped(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put('https://smartjob.az/resume/1', body(1))
+    cache.put('https://smartjob.az/resume/2', body(2))
+    digest = cache.conn.execute("SELECT digest FROM entries WHERE url LIKE '%/1'").fetchone()[0]
+    cache.object_path(digest).write_bytes(b'not zlib')
+
+    assert cache.get('https://smartjob.az/resume/1') is None
+    assert cache.summary()['entries'] == 1
+    assert not cache.object_path(digest).exists()
+    assert cache.total == cache.total_bytes()
+
+    # The next fetch stores it again
+    cache.put('https://smartjob.az/resume/1', body(1))
+    assert cache.get('https://smartjob.az/resume/1').body == body(1)
+    assert cache.total == cache.total_bytes()
+    cache.close()
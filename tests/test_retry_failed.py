@@ -0,0 +1,61 @@
+from crawl_state import CrawlState, DeadLetters
+from retry_failed import dead_letters, merge_records
+
+
+def card(number, **fields):
+    return {'name': f'Ad {number}', 'profile_url': f'https://smartjob.az/resume/{number}-dev',
+            'resume_id': f'{number}-dev', **fields}
+
+
+def test_dead_letter_log(tmp_path):
+    path = tmp_path / 'failed.ndjson'
+    log = DeadLetters(path)
+    log.fail_pages([4, 5], 'ConnectTimeout')
+    log.fail_resume(card(1), 'HTTP 503')
+    log.fail_resume(card(2), 'HTTP 503')
+    log.fail_pages([4], 'HTTP 502')
+    log.recover_page(5)
+    log.recover_resume(card(2))
+    log.recover_resume(card(3))
+
+    for reopened in (log, DeadLetters(path, resume=True)):
+        assert reopened.failed_pages() == [(4, 2, 'HTTP 502')]
+        assert reopened.failed_resumes() == [(card(1), 1, 'HTTP 503')]
+
+    # A run without --resume starts a new log
+    assert DeadLetters(path).failed_pages() == []
+    assert not path.exists()
+
+
+def test_dead_letters_combines_sources(tmp_path):
+    log = DeadLetters(tmp_path / 'failed.ndjson')
+    log.fail_pages([2], 'HTTP 503')
+    log.fail_resume(card(1), 'HTTP 503')
+    state = CrawlState(tmp_path / 'crawl_state.db')
+    state.fail_pages([2, 3], 'ValueError')
+    state.start_resume(card(1))
+    state.finish_resume(card(1), done=False, error='ConnectTimeout')
+    records = [card(1, detail_error='HTTP 503'), card(4), card(5, detail_error='ReadTimeout')]
+
+    pages, resumes = dead_letters([log, state], records)
+
+    assert pages == [(2, 1, 'HTTP 503'), (3, 0, 'ValueError')]
+    assert resumes == [(card(1), 1, 'HTTP 503'), (card(5, detail_error='ReadTimeout'), 1, 'ReadTimeout')]
+    state.close()
+
+
+def test_merge_records_restores_listing_order():
+    records = [card(1), card(2, detail_error='HTTP 503'), card(5), card(6)]
+    recovered = [card(2, skills=['SQL']), card(3), card(4)]
+    positions = {'1-dev': (1, 0), '2-dev': (1, 1), '3-dev': (2, 0), '4-dev': (2, 1), '5-dev': (3, 0)}
+
+    merged = merge_records(records, recovered, positions)
+
+    assert [record['resume_id'] for record in merged] == ['1-dev', '2-dev', '3-dev', '4-dev', '5-dev', '6-dev']
+    assert merged[1] == card(2, skills=['SQL'])
+
+
+def test_merge_records_without_positions_appends():
+    merged = merge_records([card(1), card(2, detail_error='HTTP 503')], [card(2), card(3)], {})
+
+    assert merged == [card(1), card(2), card(3)]
@@ -0,0 +1,41 @@
+import json
+import time
+
+from sharded_crawl import DONE, FAILED, PAGE, LeaseQueue
+
+
+def test_expired_lease_fails_after_max_attempts(tmp_path):
+    queue = LeaseQueue(tmp_path / 'queue.db', lease_seconds=0, max_attempts=3)
+    queue.init(1, 1, rate=100)
+
+    # A worker that dies on the page every time never completes or fails its lease
+    for attempt in range(1, 4):
+        time.sleep(0.01)
+        lease = queue.claim(f'worker-{attempt}')
+        assert lease.key == '1' and lease.attempts == attempt
+    time.sleep(0.01)
+
+    assert queue.claim('worker-4') is None
+    assert queue.is_finished()
+    assert queue.summary()[PAGE] == {FAILED: 1}
+    assert queue.failed_pages() == [(1, 3, 'LeaseExpired')]
+    # The dead worker's late result is rejected
+    assert not queue.complete(lease, [])
+    queue.close()
+
+
+def test_records_leave_out_failed_pages(tmp_path):
+    queue = LeaseQueue(tmp_path / 'queue.db', max_attempts=1)
+    queue.init(1, 2, rate=100)
+    first, second = queue.claim('worker'), queue.claim('worker')
+    assert queue.complete(first, [{'name': 'A', 'profile_url': 'https://smartjob.az/resume/1-a'}])
+    assert queue.fail(second, 'HTTP 503')
+
+    resume = queue.claim('worker')
+    assert queue.complete(resume, {**json.loads(resume.payload), 'skills': ['Python']})
+
+    assert queue.summary()[PAGE] == {DONE: 1, FAILED: 1}
+    assert queue.failed_pages() == [(2, 1, 'HTTP 503')]
+    assert [record['skills'] for record in queue.records()] == [['Python']]
+    queue.close()
+
@@ -0,0 +1,48 @@
+import pytest
+
+import columnar_export
+from consolidate import iter_records
+from conftest import ROOT
+from record_store import RecordStore
+from records import as_dict
+from smartjob_scraper import SmartJobScraper
+
+
+@pytest.mark.parametrize('columnar', columnar_export.FORMATS)
+def test_stream_copies_match_saved_copies(tmp_path, columnar):
+    records = list(iter_records(ROOT / 'full_scrape_results' / 'batch_01_10.json'))
+    scraper = SmartJobScraper(output_dir=tmp_path, columnar=columnar, record_store=True, change_feed=True,
+                              metrics_interval=None)
+
+    scraper.save_data(records, 'saved')
+    scraper.open_stream('streamed')
+    for record in records:
+        scraper.sink.write(record)
+    scraper.close_stream()
+
+    suffix = columnar_export.FORMATS[columnar]
+    assert columnar_export.to_records(columnar_export.read_table(tmp_path / f'streamed{suffix}')) == \
+        columnar_export.to_records(columnar_export.read_table(tmp_path / f'saved{suffix}'))
+    with RecordStore(tmp_path / 'streamed.records') as streamed, RecordStore(tmp_path / 'saved.records') as saved:
+        assert list(streamed) == list(saved) == records
+    streamed_feed = (tmp_path / 'streamed.changes.ndjson').read_text(encoding='utf-8').splitlines()
+    saved_feed = (tmp_path / 'saved.changes.ndjson').read_text(encoding='utf-8').splitlines()
+    assert len(streamed_feed) == len(saved_feed) == len(records) + 1
+
+
+@pytest.mark.parametrize('suffix', ['.json', '.ndjson', '.csv'])
+def test_incremental_snapshot_formats(tmp_path, suffix):
+    records = list(iter_records(ROOT / 'full_scrape_results' / 'batch_01_10.json'))
+    writer = SmartJobScraper(output_dir=tmp_path / 'previous', metrics_interval=None)
+    writer.save_data(records, 'snapshot')
+    writer.open_stream('snapshot')
+    for record in records:
+        writer.sink.write(record)
+    writer.close_stream()
+
+    scraper = SmartJobScraper(output_dir=tmp_path, metrics_interval=None,
+                              previous_snapshot=tmp_path / 'previous' / f'snapshot{suffix}')
+
+    detailed = [record for record in records if SmartJobScraper.is_detailed(record)]
+    assert len(scraper.previous) == len(detailed) > 0
+    assert as_dict(scraper.previous[detailed[0]['resume_id']]) == detailed[0]